@@ -0,0 +1,170 @@
+"""
+Benchmark sin Red del Flujo Completo
+Recolección -> mapeo a códigos del paper -> merge PIT -> factores
+
+Yahoo Finance y Alpha Vantage se reemplazan por SyntheticSource (mismos
+formatos, datos generados localmente), así que cada etapa se puede medir con
+universos de 10 a 5000 tickers sin cuota ni latencia de red (salvo la que se
+simule con latency).
+
+Uso:
+    python src/benchmark.py --sizes 10 100 1000 --save ../data/bench/actual.json
+    python src/benchmark.py --sizes 10 100 1000 --baseline ../data/bench/actual.json
+
+Con --baseline se compara contra una corrida guardada y se marcan las etapas
+más lentas que la tolerancia (regresiones).
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.data_collector import HybridDataCollector
+from src.factor_calculator import FactorCalculator
+from src.instrumentation import RunMetrics
+from src.point_in_time import PRICE_COLUMNS, load_fundamentals, merge_point_in_time
+from src.rate_limiter import RateLimiter
+from src.storage import get_storage
+from src.synthetic import SyntheticSource, synthetic_tickers
+
+STAGES = ['collect', 'save', 'mapping', 'pit', 'factors']
+
+
+def run_universe(n_tickers, storage, source=None, max_workers=8, factors=None,
+                 use_hybrid=True):
+    """
+    Corre el flujo completo sobre n_tickers sintéticos guardando en storage.
+
+    Returns:
+        RunMetrics con una etapa por paso (segundos y filas)
+    """
+    source = source or SyntheticSource()
+    tickers = synthetic_tickers(n_tickers)
+    metrics = RunMetrics(f'bench-{n_tickers}')
+
+    # Limitador sin topes: se mide el código, no la cuota de Alpha Vantage
+    collector = HybridDataCollector(
+        use_hybrid=use_hybrid, use_cache=False, verbose=False,
+        rate_limiter=RateLimiter(calls_per_minute=10 ** 9, daily_limit=10 ** 9),
+        ticker_factory=source.ticker, http_get=source.get
+    )
+
+    with metrics.stage('collect') as info:
+        universe = collector.collect_universe(tickers, source.start, source.end, max_workers)
+        info['rows'] = len(universe['results'])
+
+    with metrics.stage('save', rows=len(universe['results'])):
+        for result in universe['results'].values():
+            collector.save_data(result, storage=storage)
+
+    with metrics.stage('mapping') as info:
+        market = storage.read('market', columns=PRICE_COLUMNS)
+        fundamentals = load_fundamentals(storage)
+        info['rows'] = len(market) + len(fundamentals)
+
+    with metrics.stage('pit') as info:
+        panel = merge_point_in_time(market, fundamentals)
+        info['rows'] = len(panel)
+
+    with metrics.stage('factors', rows=len(panel)):
+        FactorCalculator(verbose=False).compute(panel, factors)
+
+    metrics.merge({'http_calls': collector.metrics.http, 'bytes': collector.metrics.bytes})
+    return metrics
+
+
+def benchmark(universe_sizes=(10, 100, 1000), backend='csv', max_workers=8, latency=0.0,
+              start="2016-01-01", end="2023-12-31", factors=None, use_hybrid=True, seed=0):
+    """
+    Mide cada etapa al crecer el universo.
+
+    Returns:
+        DataFrame con una fila por (tickers, etapa): segundos, filas y filas/s
+    """
+    source = SyntheticSource(start=start, end=end, latency=latency, seed=seed)
+    rows = []
+    for n_tickers in universe_sizes:
+        root = tempfile.mkdtemp(prefix='bench_')
+        try:
+            metrics = run_universe(n_tickers, get_storage(backend, root), source,
+                                   max_workers, factors, use_hybrid)
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+        print(f"\n🧪 {n_tickers} tickers ({backend}, {max_workers} workers)")
+        for stage in STAGES:
+            entry = metrics.stages[stage]
+            rows.append({'tickers': n_tickers, 'stage': stage, 'seconds': entry['seconds'],
+                         'rows': entry['rows'],
+                         'rows_per_second': entry['rows'] / entry['seconds'] if entry['seconds'] else None})
+            print(f"   {stage:8s} {entry['seconds']:8.2f}s  ({entry['rows']:>10,} filas)")
+        http = {name: sum(calls.values()) for name, calls in metrics.http.items()}
+        print(f"   Peticiones simuladas: {http}")
+    return pd.DataFrame(rows)
+
+
+def save_results(results, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results.to_dict(orient='records'), f, indent=2)
+    return path
+
+
+def compare(results, baseline_path, tolerance=0.25, min_seconds=0.05):
+    """
+    Compara contra una corrida guardada con save_results.
+
+    Returns:
+        DataFrame con el cambio relativo por (tickers, etapa); 'regression'
+        es True si la etapa tardó más de (1 + tolerance) veces el baseline y
+        al menos min_seconds más (las etapas de milisegundos son puro ruido)
+    """
+    with open(baseline_path) as f:
+        baseline = pd.DataFrame(json.load(f))
+    merged = results.merge(baseline[['tickers', 'stage', 'seconds']], on=['tickers', 'stage'],
+                           suffixes=('', '_baseline'))
+    merged['change'] = merged['seconds'] / merged['seconds_baseline'] - 1
+    merged['regression'] = ((merged['change'] > tolerance)
+                            & (merged['seconds'] - merged['seconds_baseline'] > min_seconds))
+
+    print(f"\n📊 Comparación contra {baseline_path} (tolerancia {tolerance:.0%})")
+    for row in merged.itertuples():
+        flag = '⚠️ ' if row.regression else '✅'
+        print(f"   {flag} {row.tickers:5d} {row.stage:8s} {row.seconds_baseline:7.2f}s -> "
+              f"{row.seconds:7.2f}s ({row.change:+.0%})")
+    return merged
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark sin red del flujo completo")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--backend', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help="segundos simulados por petición")
+    parser.add_argument('--start', default="2016-01-01")
+    parser.add_argument('--end', default="2023-12-31")
+    parser.add_argument('--yahoo-only', action='store_true')
+    parser.add_argument('--save', help="guardar resultados en JSON")
+    parser.add_argument('--baseline', help="JSON de una corrida anterior para comparar")
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    print("🧪 Benchmark sin red (Yahoo / Alpha Vantage sintéticos)")
+    results = benchmark(args.sizes, args.backend, args.workers, args.latency,
+                        args.start, args.end, use_hybrid=not args.yahoo_only)
+    if args.baseline:
+        compared = compare(results, args.baseline, args.tolerance)
+        if compared['regression'].any():
+            sys.exit(1)
+    if args.save:
+        save_results(results, args.save)
+        print(f"\n💾 Resultados: {args.save}")
@@ -6,15 +6,121 @@ Combina Yahoo Finance + Alpha Vantage para máxima cobertura
 import yfinance as yf
 import pandas as pd
 import numpy as np
-import requests
-from time import sleep
+from time import perf_counter, sleep, time
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
 import sys
 
 # Importar configuración
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from config.api_keys import ALPHA_VANTAGE_KEY, ALPHA_VANTAGE_DAILY_LIMIT, ALPHA_VANTAGE_CALLS_PER_MINUTE
+from src.http_client import HttpClient
+from src.rate_limiter import RateLimiter
+from src.response_cache import ResponseCache
+from src.storage import CsvStorage
+from src.instrumentation import RunMetrics, instrumented, payload_bytes
+from src.job_manifest import JobManifest, DONE
+from src.diccionario_variables import (
+    MAPEO_CONTABLE_YAHOO, MAPEO_CONTABLE_ALPHA_VANTAGE, ESTADOS_ALPHA_VANTAGE,
+    SIGNO_ALPHA_VANTAGE_A_YAHOO, get_paper_code
+)
+
+ALPHA_VANTAGE_URL = "https://www.alphavantage.co/query"
+
+# Backoff base (segundos) de los reintentos de Alpha Vantage: su límite es por minuto
+ALPHA_VANTAGE_RETRY_BACKOFF = 15.0
+
+# Estado -> función de la API de Alpha Vantage
+ALPHA_VANTAGE_FUNCTIONS = {
+    'income': 'INCOME_STATEMENT',
+    'balance': 'BALANCE_SHEET',
+    'cashflow': 'CASH_FLOW',
+}
+
+# Items de Yahoo cuya ausencia dispara el complemento de Alpha Vantage
+CRITICAL_ITEMS = [
+    'Total Revenue', 'Cost Of Revenue', 'EBIT', 'Net Income',
+    'Total Assets', 'Total Liabilities Net Minority Interest',
+    'Stockholders Equity', 'Capital Expenditure', 'Operating Cash Flow'
+]
+
+
+class TickerFetchContext:
+    """
+    Contexto de descarga por ticker: un solo yf.Ticker y cada estado
+    financiero se descarga como máximo una vez.
+    
+    fetch_counts registra cuántas peticiones HTTP costó cada recurso y
+    cache_hits cuántos se sirvieron desde el ResponseCache (si hay); con
+    metrics (RunMetrics) cada petición también se suma al reporte de la corrida.
+    ticker_factory reemplaza a yf.Ticker (p.ej. SyntheticSource.ticker).
+    """
+    
+    def __init__(self, ticker, cache=None, metrics=None, ticker_factory=None):
+        self.ticker = ticker
+        self.cache = cache
+        self.metrics = metrics
+        self.ticker_factory = ticker_factory or yf.Ticker
+        self._empresa = None
+        self._data = {}
+        self.fetch_counts = {}
+        self.cache_hits = 0
+    
+    @property
+    def empresa(self):
+        if self._empresa is None:
+            self._empresa = self.ticker_factory(self.ticker)
+        return self._empresa
+    
+    @property
+    def total_fetches(self):
+        return sum(self.fetch_counts.values())
+    
+    def _load(self, name, loader, data_type, start=None, end=None):
+        """Ejecuta loader solo la primera vez que se pide (name, start, end)"""
+        key = (name, start, end)
+        if key in self._data:
+            return self._data[key]
+        
+        def counted_loader():
+            self.fetch_counts[name] = self.fetch_counts.get(name, 0) + 1
+            value = loader()
+            if self.metrics is not None:
+                self.metrics.count_http('yahoo', name, payload_bytes(value))
+            return value
+        
+        if self.cache is None:
+            value = counted_loader()
+        else:
+            fetches_before = self.total_fetches
+            value = self.cache.fetch('yahoo', name, self.ticker, counted_loader,
+                                     data_type, start, end)
+            if self.total_fetches == fetches_before:
+                self.cache_hits += 1
+        
+        self._data[key] = value
+        return value
+    
+    def history(self, start, end):
+        return self._load('history', lambda: self.empresa.history(start=start, end=end),
+                          'prices', start, end)
+    
+    @property
+    def balance_sheet(self):
+        return self._load('balance_sheet', lambda: self.empresa.balance_sheet.T, 'statements')
+    
+    @property
+    def financials(self):
+        return self._load('financials', lambda: self.empresa.financials.T, 'statements')
+    
+    @property
+    def cashflow(self):
+        return self._load('cashflow', lambda: self.empresa.cashflow.T, 'statements')
+    
+    @property
+    def info(self):
+        return self._load('info', lambda: self.empresa.info, 'info')
 
 
 class HybridDataCollector:
@@ -24,55 +130,177 @@ class HybridDataCollector:
     2. Alpha Vantage (complemento, 500 calls/día gratis)
     """
     
-    def __init__(self, alpha_vantage_key=None, use_hybrid=True):
+    def __init__(self, alpha_vantage_key=None, use_hybrid=True, rate_limiter=None,
+                 av_state_path="../data/.alpha_vantage_calls.json",
+                 cache=None, use_cache=True, offline=False, storage=None,
+                 verbose=True, metrics=None, ticker_factory=None, http_get=None,
+                 http_client=None, av_concurrency=3):
         self.av_key = alpha_vantage_key or ALPHA_VANTAGE_KEY
         self.use_hybrid = use_hybrid
-        self.av_calls_today = 0
         self.av_limit = ALPHA_VANTAGE_DAILY_LIMIT
+        # Un solo limitador compartido por todas las llamadas (y threads) de AV
+        self.av_limiter = rate_limiter or RateLimiter(
+            calls_per_minute=ALPHA_VANTAGE_CALLS_PER_MINUTE,
+            daily_limit=ALPHA_VANTAGE_DAILY_LIMIT,
+            state_path=av_state_path
+        )
+        # Cache de respuestas en disco (offline=True: solo se sirve desde cache)
+        if cache is None and (use_cache or offline):
+            cache = ResponseCache("../data/cache", offline=offline)
+        self.cache = cache
+        # Backend de almacenamiento (None = CSV por ticker en el output_dir de save_data)
+        self.storage = storage
+        # Métricas de la corrida (tiempos por etapa, HTTP, bytes, errores)
+        self.metrics = metrics or RunMetrics('collector')
+        # verbose=False: sin prints (en loops de miles de tickers pesan)
+        self.verbose = verbose
+        # Fuentes inyectables (benchmarks sin red: ver src/synthetic.py).
+        # La descarga masiva (yf.download) siempre va a Yahoo.
+        self.ticker_factory = ticker_factory or yf.Ticker
+        # Sesión HTTP compartida (keep-alive, timeouts, reintentos); http_get
+        # reemplaza solo el transporte
+        self.http = http_client or HttpClient(transport=http_get, metrics=self.metrics)
+        # Estados de AV de un mismo ticker que se piden a la vez
+        self.av_concurrency = av_concurrency
         self.errors = []
         
-        print(f"🚀 HybridDataCollector inicializado")
-        print(f"   Modo: {'Híbrido (Yahoo + Alpha Vantage)' if use_hybrid else 'Solo Yahoo Finance'}")
+        self._log(f"🚀 HybridDataCollector inicializado")
+        self._log(f"   Modo: {'Híbrido (Yahoo + Alpha Vantage)' if use_hybrid else 'Solo Yahoo Finance'}")
         if use_hybrid and self.av_key == "demo":
-            print(f"   ⚠️  Usando API key demo - obtén la tuya en https://www.alphavantage.co/support/#api-key")
+            self._log(f"   ⚠️  Usando API key demo - obtén la tuya en https://www.alphavantage.co/support/#api-key")
+        if self.cache is not None and self.cache.offline:
+            self._log(f"   📴 Modo offline: solo datos en cache ({self.cache.cache_dir})")
+    
+    def _log(self, message):
+        if self.verbose:
+            print(message)
+    
+    def _record_error(self, ticker, source, error):
+        """Registra un error en self.errors y en las métricas de la corrida"""
+        self.errors.append(self.metrics.record_error(ticker, source, error))
+    
+    def _new_context(self, ticker):
+        return TickerFetchContext(ticker, cache=self.cache, metrics=self.metrics,
+                                  ticker_factory=self.ticker_factory)
+    
+    def run_report(self, path=None, extra=None):
+        """Reporte de la corrida (dict); con path se guarda en JSON o Parquet"""
+        cache_stats = self.cache.stats if self.cache is not None else None
+        extra = {'av_calls_today': self.av_calls_today, **(extra or {})}
+        if path:
+            self.metrics.write_report(path, cache_stats, extra)
+        return self.metrics.report(cache_stats, extra)
     
     # ===== YAHOO FINANCE =====
     
-    def get_yahoo_market_data(self, ticker, start="2016-01-01", end="2023-12-31"):
+    @instrumented('yahoo_market')
+    def get_yahoo_market_data(self, ticker, start="2016-01-01", end="2023-12-31", ctx=None):
         """Obtener datos de mercado (precios diarios) de Yahoo Finance"""
+        ctx = ctx or self._new_context(ticker)
         try:
-            empresa = yf.Ticker(ticker)
-            historia = empresa.history(start=start, end=end)
+            historia = ctx.history(start, end).copy()
             
             if historia.empty:
-                print(f"⚠️ No se encontraron datos de mercado para {ticker}")
+                self._log(f"⚠️ No se encontraron datos de mercado para {ticker}")
                 return None
             
             historia.reset_index(inplace=True)
-            print(f"✅ Datos de mercado Yahoo: {len(historia)} días")
+            self._log(f"✅ Datos de mercado Yahoo: {len(historia)} días")
             return historia
             
         except Exception as e:
-            print(f"❌ Error obteniendo datos de mercado Yahoo para {ticker}: {e}")
-            self.errors.append({'ticker': ticker, 'source': 'yahoo_market', 'error': str(e)})
+            self._log(f"❌ Error obteniendo datos de mercado Yahoo para {ticker}: {e}")
+            self._record_error(ticker, 'yahoo_market', e)
             return None
     
-    def get_yahoo_financials(self, ticker):
+    @instrumented('yahoo_market_bulk')
+    def get_yahoo_market_data_bulk(self, tickers, start="2016-01-01", end="2023-12-31", chunk_size=100):
+        """
+        Descarga precios diarios de muchos tickers con yf.download (una
+        petición por bloque de chunk_size símbolos).
+        
+        Returns:
+            dict ticker -> DataFrame con el mismo formato que get_yahoo_market_data
+            (los tickers sin datos no aparecen en el dict)
+        """
+        tickers = list(dict.fromkeys(tickers))
+        market_data = {}
+        
+        # Servir desde cache lo que ya esté y descargar solo el resto
+        if self.cache is not None:
+            for ticker in tickers:
+                df = self.cache.get('yahoo', 'download', ticker, 'prices', start, end, default=None)
+                if df is not None:
+                    market_data[ticker] = df
+            if self.cache.offline:
+                return market_data
+        pending = [t for t in tickers if t not in market_data]
+        
+        for i in range(0, len(pending), chunk_size):
+            chunk = pending[i:i + chunk_size]
+            try:
+                raw = yf.download(
+                    chunk, start=start, end=end,
+                    group_by='ticker', actions=True, auto_adjust=True,
+                    threads=True, progress=False
+                )
+            except Exception as e:
+                self._log(f"❌ Error en descarga masiva ({len(chunk)} tickers): {e}")
+                for ticker in chunk:
+                    self._record_error(ticker, 'yahoo_market_bulk', e)
+                continue
+            
+            self.metrics.count_http('yahoo', 'download', payload_bytes(raw))
+            if raw is None or raw.empty:
+                continue
+            
+            frames = self._split_bulk_download(raw, chunk)
+            if self.cache is not None:
+                for ticker, df in frames.items():
+                    self.cache.put('yahoo', 'download', ticker, df, start, end)
+            market_data.update(frames)
+            self._log(f"✅ Bloque {i // chunk_size + 1}: {len(chunk)} tickers descargados")
+        
+        self._log(f"✅ Datos de mercado Yahoo (masivo): {len(market_data)}/{len(tickers)} tickers")
+        return market_data
+    
+    @staticmethod
+    def _split_bulk_download(raw, chunk):
+        """Separa el DataFrame multi-ticker de yf.download en un frame por ticker"""
+        columnas = ['Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits']
+        frames = {}
+        
+        if not isinstance(raw.columns, pd.MultiIndex):
+            # Un solo ticker sin columnas multinivel
+            raw = pd.concat({chunk[0]: raw}, axis=1)
+        
+        for ticker in raw.columns.get_level_values(0).unique():
+            df = raw[ticker].dropna(how='all')
+            if df.empty:
+                continue
+            df = df[[c for c in columnas if c in df.columns]].copy()
+            df.columns.name = None
+            df.index.name = 'Date'
+            frames[ticker] = df.reset_index()
+        
+        return frames
+    
+    @instrumented('yahoo_financials')
+    def get_yahoo_financials(self, ticker, ctx=None):
         """Obtener datos financieros de Yahoo Finance"""
+        ctx = ctx or self._new_context(ticker)
         try:
-            empresa = yf.Ticker(ticker)
-            
             # Balance Sheet
-            balance = empresa.balance_sheet.T if hasattr(empresa, 'balance_sheet') else pd.DataFrame()
+            balance = ctx.balance_sheet
             
             # Income Statement
-            income = empresa.financials.T if hasattr(empresa, 'financials') else pd.DataFrame()
+            income = ctx.financials
             
             # Cash Flow
-            cashflow = empresa.cashflow.T if hasattr(empresa, 'cashflow') else pd.DataFrame()
+            cashflow = ctx.cashflow
             
             if balance.empty and income.empty and cashflow.empty:
-                print(f"⚠️ No se encontraron datos financieros para {ticker}")
+                self._log(f"⚠️ No se encontraron datos financieros para {ticker}")
                 return None
             
             # Unir todos los datos
@@ -80,159 +308,225 @@ class HybridDataCollector:
             datos_financieros.index.name = "Date"
             datos_financieros.reset_index(inplace=True)
             
-            print(f"✅ Datos financieros Yahoo: {len(datos_financieros)} reportes")
-            print(f"   Columnas disponibles: {len(datos_financieros.columns)}")
+            self._log(f"✅ Datos financieros Yahoo: {len(datos_financieros)} reportes")
+            self._log(f"   Columnas disponibles: {len(datos_financieros.columns)}")
             
             return datos_financieros
             
         except Exception as e:
-            print(f"❌ Error obteniendo datos financieros Yahoo para {ticker}: {e}")
-            self.errors.append({'ticker': ticker, 'source': 'yahoo_financials', 'error': str(e)})
+            self._log(f"❌ Error obteniendo datos financieros Yahoo para {ticker}: {e}")
+            self._record_error(ticker, 'yahoo_financials', e)
             return None
     
-    def get_yahoo_shares_outstanding(self, ticker):
-        """Obtener shares outstanding históricos de Yahoo"""
+    @instrumented('yahoo_shares')
+    def get_yahoo_shares_outstanding(self, ticker, ctx=None):
+        """
+        Obtener shares outstanding históricos de Yahoo
+        
+        Con el mismo ctx que get_yahoo_financials se reutiliza el balance ya
+        descargado; .info solo se pide si el balance no trae las acciones.
+        """
+        ctx = ctx or self._new_context(ticker)
         try:
-            empresa = yf.Ticker(ticker)
-            balance = empresa.balance_sheet.T
+            balance = ctx.balance_sheet
             
             if 'Ordinary Shares Number' in balance.columns:
                 shares = balance[['Ordinary Shares Number']].copy()
                 shares.index = pd.to_datetime(shares.index)
                 shares.columns = ['shares_outstanding']
-                print(f"✅ Shares outstanding: {len(shares)} observaciones")
+                self._log(f"✅ Shares outstanding: {len(shares)} observaciones")
                 return shares
             else:
                 # Fallback: usar valor actual
-                info = empresa.info
+                info = ctx.info
                 shares_current = info.get('sharesOutstanding', None)
                 if shares_current:
-                    print(f"⚠️ Usando shares outstanding actual: {shares_current:,.0f}")
+                    self._log(f"⚠️ Usando shares outstanding actual: {shares_current:,.0f}")
                     return pd.DataFrame({'shares_outstanding': [shares_current]}, 
                                        index=[pd.Timestamp.now()])
                 else:
-                    print(f"⚠️ No se encontraron shares outstanding para {ticker}")
+                    self._log(f"⚠️ No se encontraron shares outstanding para {ticker}")
                     return None
                 
         except Exception as e:
-            print(f"⚠️ Error obteniendo shares: {e}")
+            self._log(f"⚠️ Error obteniendo shares: {e}")
             return None
     
     # ===== ALPHA VANTAGE =====
     
+    @property
+    def av_calls_today(self):
+        """Llamadas a Alpha Vantage en las últimas 24h (persistido entre sesiones)"""
+        return self.av_limiter.calls_today
+    
+    def _alpha_vantage_query(self, ticker, function):
+        """
+        Hace una llamada a Alpha Vantage respetando el rate limiter.
+        Retorna el JSON de respuesta o None si se agotó el límite diario.
+        
+        Las respuestas con reportes se guardan en cache, así una re-ejecución
+        no consume cuota.
+        """
+        if self.cache is not None:
+            return self.cache.fetch(
+                'alpha_vantage', function, ticker,
+                lambda: self._alpha_vantage_request(ticker, function),
+                'statements', cacheable=lambda data: 'annualReports' in data
+            )
+        return self._alpha_vantage_request(ticker, function)
+    
+    @staticmethod
+    def _alpha_vantage_notice(data):
+        """
+        Aviso de Alpha Vantage ("Note" / "Information", llega con status 200).
+        
+        El aviso clásico ("...5 calls per minute and 500 calls per day") es el
+        mismo para los dos límites, así que no alcanza con buscar 'minute'.
+        
+        Returns:
+            (texto, tipo) con tipo 'minute' (límite por minuto: reintentar),
+            'daily' (cuota del día agotada), 'limit' (nombra ambos límites: se
+            reintenta una vez y, si sigue, se toma como cuota diaria) u 'other';
+            (None, None) si no hay aviso
+        """
+        if not isinstance(data, dict) or 'annualReports' in data:
+            return None, None
+        text = data.get('Note') or data.get('Information')
+        if not text:
+            return None, None
+        lower = text.lower()
+        daily = 'per day' in lower or 'daily' in lower
+        minute = 'minute' in lower or 'per second' in lower
+        if daily and minute:
+            return text, 'limit'
+        if daily:
+            return text, 'daily'
+        if minute or 'frequency' in lower:
+            return text, 'minute'
+        return text, 'other'
+    
+    def _alpha_vantage_retry_reason(self, response, seen):
+        """
+        retry_if del cliente HTTP: reintentar throttles por minuto, respuestas
+        no JSON y, una sola vez por petición (seen), los avisos 'limit'
+        """
+        try:
+            data = response.json()
+        except ValueError:
+            return "respuesta no JSON"
+        text, kind = self._alpha_vantage_notice(data)
+        if kind == 'minute' or (kind == 'limit' and kind not in seen):
+            seen.add(kind)
+            self._log(f"⏳ Alpha Vantage pidió esperar: {text[:80]}")
+            return f"throttle: {text[:120]}"
+        return None
+    
+    def _alpha_vantage_acquire(self):
+        """before_attempt del cliente HTTP: cada intento (reintentos incluidos) gasta una llamada"""
+        if not self.av_limiter.acquire():
+            self._log(f"⚠️ Límite diario de Alpha Vantage alcanzado ({self.av_limit} calls)")
+            return False
+        self._log(f"📊 Alpha Vantage call #{self.av_calls_today}/{self.av_limit}")
+        return True
+    
+    def _alpha_vantage_request(self, ticker, function):
+        """
+        Petición HTTP a Alpha Vantage (cada intento consume una llamada del limitador).
+        
+        Los errores de red, 5xx y throttles por minuto se reintentan con
+        backoff (HttpClient); si se agotan, HttpRetryError llega al get_*.
+        Un aviso de cuota diaria agotada deja el limitador sin cupo.
+        """
+        params = {
+            'function': function,
+            'symbol': ticker,
+            'apikey': self.av_key
+        }
+        
+        seen = set()
+        response = self.http.get(ALPHA_VANTAGE_URL, params=params,
+                                 retry_if=lambda r: self._alpha_vantage_retry_reason(r, seen),
+                                 backoff_base=ALPHA_VANTAGE_RETRY_BACKOFF,
+                                 before_attempt=self._alpha_vantage_acquire)
+        if response is None:
+            return None
+        self.metrics.count_http('alpha_vantage', function, len(response.content))
+        data = response.json()
+        
+        text, kind = self._alpha_vantage_notice(data)
+        if kind in ('daily', 'limit'):
+            self.av_limiter.mark_exhausted()
+            self._log(f"⚠️ Alpha Vantage: cuota diaria agotada")
+            self._record_error(ticker, 'alpha_vantage', f"{function}: cuota diaria agotada")
+            return None
+        if kind == 'other':
+            self._record_error(ticker, 'alpha_vantage', f"{function}: {text[:200]}")
+        return data
+    
+    @instrumented('av_income')
     def get_alpha_vantage_income(self, ticker):
         """Obtener Income Statement de Alpha Vantage"""
-        if not self.use_hybrid or self.av_calls_today >= self.av_limit:
+        if not self.use_hybrid:
             return None
         
         try:
-            url = "https://www.alphavantage.co/query"
-            params = {
-                'function': 'INCOME_STATEMENT',
-                'symbol': ticker,
-                'apikey': self.av_key
-            }
-            
-            response = requests.get(url, params=params)
-            data = response.json()
-            
-            self.av_calls_today += 1
-            print(f"📊 Alpha Vantage call #{self.av_calls_today}/{self.av_limit}")
+            data = self._alpha_vantage_query(ticker, 'INCOME_STATEMENT')
             
-            # Rate limiting (5 calls/min gratis)
-            if self.av_calls_today % ALPHA_VANTAGE_CALLS_PER_MINUTE == 0:
-                print("⏳ Esperando 60s (límite de rate)...")
-                sleep(60)
-            else:
-                sleep(12)  # 12s entre llamadas = 5 calls/min
-            
-            if 'annualReports' in data:
+            if data and 'annualReports' in data:
                 df = pd.DataFrame(data['annualReports'])
-                print(f"✅ Income Statement AV: {len(df)} reportes")
+                self._log(f"✅ Income Statement AV: {len(df)} reportes")
                 return df
             else:
-                print(f"⚠️ No hay datos de Income Statement en Alpha Vantage")
+                self._log(f"⚠️ No hay datos de Income Statement en Alpha Vantage")
                 return None
                 
         except Exception as e:
-            print(f"❌ Error Alpha Vantage Income: {e}")
-            self.errors.append({'ticker': ticker, 'source': 'av_income', 'error': str(e)})
+            self._log(f"❌ Error Alpha Vantage Income: {e}")
+            self._record_error(ticker, 'av_income', e)
             return None
     
+    @instrumented('av_balance')
     def get_alpha_vantage_balance(self, ticker):
         """Obtener Balance Sheet de Alpha Vantage"""
-        if not self.use_hybrid or self.av_calls_today >= self.av_limit:
+        if not self.use_hybrid:
             return None
         
         try:
-            url = "https://www.alphavantage.co/query"
-            params = {
-                'function': 'BALANCE_SHEET',
-                'symbol': ticker,
-                'apikey': self.av_key
-            }
-            
-            response = requests.get(url, params=params)
-            data = response.json()
+            data = self._alpha_vantage_query(ticker, 'BALANCE_SHEET')
             
-            self.av_calls_today += 1
-            print(f"📊 Alpha Vantage call #{self.av_calls_today}/{self.av_limit}")
-            
-            if self.av_calls_today % ALPHA_VANTAGE_CALLS_PER_MINUTE == 0:
-                print("⏳ Esperando 60s (límite de rate)...")
-                sleep(60)
-            else:
-                sleep(12)
-            
-            if 'annualReports' in data:
+            if data and 'annualReports' in data:
                 df = pd.DataFrame(data['annualReports'])
-                print(f"✅ Balance Sheet AV: {len(df)} reportes")
+                self._log(f"✅ Balance Sheet AV: {len(df)} reportes")
                 return df
             else:
-                print(f"⚠️ No hay datos de Balance Sheet en Alpha Vantage")
+                self._log(f"⚠️ No hay datos de Balance Sheet en Alpha Vantage")
                 return None
                 
         except Exception as e:
-            print(f"❌ Error Alpha Vantage Balance: {e}")
-            self.errors.append({'ticker': ticker, 'source': 'av_balance', 'error': str(e)})
+            self._log(f"❌ Error Alpha Vantage Balance: {e}")
+            self._record_error(ticker, 'av_balance', e)
             return None
     
+    @instrumented('av_cashflow')
     def get_alpha_vantage_cashflow(self, ticker):
         """Obtener Cash Flow de Alpha Vantage"""
-        if not self.use_hybrid or self.av_calls_today >= self.av_limit:
+        if not self.use_hybrid:
             return None
         
         try:
-            url = "https://www.alphavantage.co/query"
-            params = {
-                'function': 'CASH_FLOW',
-                'symbol': ticker,
-                'apikey': self.av_key
-            }
-            
-            response = requests.get(url, params=params)
-            data = response.json()
+            data = self._alpha_vantage_query(ticker, 'CASH_FLOW')
             
-            self.av_calls_today += 1
-            print(f"📊 Alpha Vantage call #{self.av_calls_today}/{self.av_limit}")
-            
-            if self.av_calls_today % ALPHA_VANTAGE_CALLS_PER_MINUTE == 0:
-                print("⏳ Esperando 60s (límite de rate)...")
-                sleep(60)
-            else:
-                sleep(12)
-            
-            if 'annualReports' in data:
+            if data and 'annualReports' in data:
                 df = pd.DataFrame(data['annualReports'])
-                print(f"✅ Cash Flow AV: {len(df)} reportes")
+                self._log(f"✅ Cash Flow AV: {len(df)} reportes")
                 return df
             else:
-                print(f"⚠️ No hay datos de Cash Flow en Alpha Vantage")
+                self._log(f"⚠️ No hay datos de Cash Flow en Alpha Vantage")
                 return None
                 
         except Exception as e:
-            print(f"❌ Error Alpha Vantage CashFlow: {e}")
-            self.errors.append({'ticker': ticker, 'source': 'av_cashflow', 'error': str(e)})
+            self._log(f"❌ Error Alpha Vantage CashFlow: {e}")
+            self._record_error(ticker, 'av_cashflow', e)
             return None
     
     # ===== MÉTODOS PRINCIPALES =====
@@ -249,13 +543,114 @@ class HybridDataCollector:
         
         return missing
     
-    def collect_company_data(self, ticker, start="2016-01-01", end="2023-12-31"):
+    def plan_alpha_vantage_statements(self, missing_columns):
+        """
+        Estados de Alpha Vantage (income/balance/cashflow) que cubren las
+        columnas de Yahoo que faltan, según MAPEO_CONTABLE_ALPHA_VANTAGE.
+        """
+        codes = {get_paper_code(col) for col in missing_columns}
+        codes = {c for c in codes if c in MAPEO_CONTABLE_ALPHA_VANTAGE}
+        return [statement for statement, statement_codes in ESTADOS_ALPHA_VANTAGE.items()
+                if codes.intersection(statement_codes)]
+    
+    def merge_alpha_vantage(self, financial_data, supplement):
+        """
+        Completa el frame de Yahoo con los estados de Alpha Vantage.
+        
+        Los valores de AV se alinean por fecha fiscal (fiscalDateEnding = Date)
+        y solo rellenan celdas vacías o columnas ausentes: Yahoo tiene prioridad.
+        
+        Returns:
+            (financial_data completado, dict columna_yahoo -> celdas rellenadas)
+        """
+        frames = []
+        for statement, df in supplement.items():
+            if df is None or 'fiscalDateEnding' not in df.columns:
+                continue
+            codes = [code for code in ESTADOS_ALPHA_VANTAGE[statement]
+                     if code in MAPEO_CONTABLE_YAHOO and MAPEO_CONTABLE_ALPHA_VANTAGE[code] in df.columns]
+            columns = {MAPEO_CONTABLE_ALPHA_VANTAGE[code]: MAPEO_CONTABLE_YAHOO[code] for code in codes}
+            signs = [SIGNO_ALPHA_VANTAGE_A_YAHOO.get(code, 1) for code in codes]
+            av = df[list(columns)].apply(pd.to_numeric, errors='coerce') * signs  # "None" -> NaN
+            av.index = pd.to_datetime(df['fiscalDateEnding'])
+            frames.append(av.rename(columns=columns))
+        
+        if not frames or financial_data is None:
+            return financial_data, {}
+        
+        av = pd.concat(frames, axis=1)
+        av = av.loc[~av.index.duplicated(), ~av.columns.duplicated()]
+        
+        yahoo = financial_data.set_index(pd.to_datetime(financial_data['Date']).dt.normalize())
+        aligned = av.reindex(yahoo.index)
+        
+        before = yahoo.reindex(columns=aligned.columns).isna() & aligned.notna()
+        merged = yahoo.combine_first(aligned)
+        merged = merged[list(yahoo.columns) + [c for c in aligned.columns if c not in yahoo.columns]]
+        
+        filled = before.sum()
+        filled = {col: int(n) for col, n in filled.items() if n > 0}
+        return merged.reset_index(drop=True), filled
+    
+    def supplement_alpha_vantage(self, ticker, financial_data):
+        """
+        Pide a Alpha Vantage solo los estados que cubren los items críticos
+        que faltan en Yahoo y los mezcla con financial_data.
+        
+        Returns:
+            dict con 'statements' (estados pedidos), 'supplement' (estado ->
+            DataFrame o None), 'financial_data' (completado) y 'filled'
+        """
+        out = {'statements': [], 'supplement': {}, 'financial_data': financial_data, 'filled': {}}
+        missing = self.check_data_completeness(financial_data, CRITICAL_ITEMS)
+        
+        if not missing:
+            self._log(f"✅ Todos los items críticos están presentes en Yahoo")
+            return out
+        if not self.use_hybrid:
+            self._log(f"⚠️ Faltan {len(missing)} items pero modo híbrido desactivado")
+            return out
+        
+        self._log(f"⚠️ Faltan {len(missing)} items críticos en Yahoo:")
+        for item in missing[:5]:  # Mostrar solo primeros 5
+            self._log(f"   - {item}")
+        
+        # Pedir solo los estados de AV que cubren lo que falta
+        out['statements'] = self.plan_alpha_vantage_statements(missing)
+        self._log(f"\n🔄 Complementando con Alpha Vantage: {', '.join(out['statements']) or 'nada que pedir'}")
+        
+        fetchers = {
+            'income': self.get_alpha_vantage_income,
+            'balance': self.get_alpha_vantage_balance,
+            'cashflow': self.get_alpha_vantage_cashflow,
+        }
+        # Los estados se piden a la vez (el limitador compartido marca el ritmo)
+        workers = max(min(self.av_concurrency, len(out['statements'])), 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            fetched = executor.map(lambda statement: fetchers[statement](ticker), out['statements'])
+            out['supplement'] = dict(zip(out['statements'], fetched))
+        
+        # Rellenar los huecos de Yahoo con los valores de AV
+        out['financial_data'], out['filled'] = self.merge_alpha_vantage(financial_data, out['supplement'])
+        if out['filled']:
+            self._log(f"✅ Alpha Vantage completó {sum(out['filled'].values())} valores "
+                      f"en {len(out['filled'])} columnas")
+        return out
+    
+    @instrumented('collect_company')
+    def collect_company_data(self, ticker, start="2016-01-01", end="2023-12-31", market_data=None,
+                             alpha_vantage=True):
         """
         Recolecta TODOS los datos de una empresa usando estrategia híbrida
+        
+        Si market_data ya viene descargado (p.ej. desde get_yahoo_market_data_bulk)
+        se omite la petición de precios. Con alpha_vantage=False se omite el
+        paso 4 (run_collection_job lo hace aparte, según la cuota del día).
         """
-        print(f"\n{'='*60}")
-        print(f"🏢 Recolectando datos para {ticker}")
-        print(f"{'='*60}")
+        n_errors = len(self.errors)
+        self._log(f"\n{'='*60}")
+        self._log(f"🏢 Recolectando datos para {ticker}")
+        self._log(f"{'='*60}")
         
         result = {
             'ticker': ticker,
@@ -264,66 +659,260 @@ class HybridDataCollector:
             'financial_data': None,
             'shares_outstanding': None,
             'alpha_vantage_supplement': {},
+            'av_filled': {},
             'data_quality': {},
+            'http_fetches': {},
             'errors': []
         }
         
+        # Un solo contexto de descarga para todos los pasos de Yahoo
+        ctx = self._new_context(ticker)
+        
         # 1. DATOS DE MERCADO (Yahoo - siempre primero)
-        print("\n📈 Paso 1/4: Datos de Mercado")
-        result['market_data'] = self.get_yahoo_market_data(ticker, start, end)
+        self._log("\n📈 Paso 1/4: Datos de Mercado")
+        if market_data is not None:
+            result['market_data'] = market_data
+        else:
+            result['market_data'] = self.get_yahoo_market_data(ticker, start, end, ctx=ctx)
         
         # 2. DATOS FINANCIEROS (Yahoo)
-        print("\n📊 Paso 2/4: Datos Financieros")
-        result['financial_data'] = self.get_yahoo_financials(ticker)
+        self._log("\n📊 Paso 2/4: Datos Financieros")
+        result['financial_data'] = self.get_yahoo_financials(ticker, ctx=ctx)
         
         # 3. SHARES OUTSTANDING (Yahoo)
-        print("\n🔢 Paso 3/4: Shares Outstanding")
-        result['shares_outstanding'] = self.get_yahoo_shares_outstanding(ticker)
+        self._log("\n🔢 Paso 3/4: Shares Outstanding")
+        result['shares_outstanding'] = self.get_yahoo_shares_outstanding(ticker, ctx=ctx)
         
         # 4. COMPLEMENTAR CON ALPHA VANTAGE (si hay gaps)
-        print("\n🔍 Paso 4/4: Verificando completitud de datos")
+        self._log("\n🔍 Paso 4/4: Verificando completitud de datos")
         
-        if result['financial_data'] is not None:
-            critical_items = [
-                'Total Revenue', 'Cost Of Revenue', 'EBIT', 'Net Income',
-                'Total Assets', 'Total Liabilities Net Minority Interest',
-                'Stockholders Equity', 'Capital Expenditure', 'Operating Cash Flow'
-            ]
-            
-            missing = self.check_data_completeness(result['financial_data'], critical_items)
-            
-            if missing and self.use_hybrid:
-                print(f"⚠️ Faltan {len(missing)} items críticos en Yahoo:")
-                for item in missing[:5]:  # Mostrar solo primeros 5
-                    print(f"   - {item}")
-                
-                print(f"\n🔄 Complementando con Alpha Vantage...")
-                
-                # Obtener datos de AV
-                av_income = self.get_alpha_vantage_income(ticker)
-                av_balance = self.get_alpha_vantage_balance(ticker)
-                av_cashflow = self.get_alpha_vantage_cashflow(ticker)
-                
-                result['alpha_vantage_supplement'] = {
-                    'income': av_income,
-                    'balance': av_balance,
-                    'cashflow': av_cashflow
-                }
-            elif missing:
-                print(f"⚠️ Faltan {len(missing)} items pero modo híbrido desactivado")
-            else:
-                print(f"✅ Todos los items críticos están presentes en Yahoo")
+        if result['financial_data'] is not None and alpha_vantage:
+            av = self.supplement_alpha_vantage(ticker, result['financial_data'])
+            result['financial_data'] = av['financial_data']
+            result['alpha_vantage_supplement'] = av['supplement']
+            result['av_filled'] = av['filled']
+        
+        result['http_fetches'] = dict(ctx.fetch_counts)
+        
+        # Errores de este ticker en esta llamada (self.errors es compartido entre tickers)
+        result['errors'] = [e for e in self.errors[n_errors:] if e['ticker'] == ticker]
         
         # Calcular métricas de calidad
         result['data_quality'] = self._calculate_data_quality(result)
         
-        print(f"\n{'='*60}")
-        print(f"✅ Recolección completada para {ticker}")
-        print(f"   Calidad de datos: {result['data_quality']['overall_score']:.1f}%")
-        print(f"{'='*60}")
+        self._log(f"\n{'='*60}")
+        self._log(f"✅ Recolección completada para {ticker}")
+        self._log(f"   Calidad de datos: {result['data_quality']['overall_score']:.1f}%")
+        self._log(f"   Peticiones Yahoo: {ctx.total_fetches}")
+        self._log(f"{'='*60}")
         
         return result
     
+    def collect_universe(self, tickers, start="2016-01-01", end="2023-12-31", max_workers=8,
+                         bulk_market=False, market_chunk_size=100, report_path=None):
+        """
+        Recolecta muchas empresas en paralelo con un pool de threads acotado.
+        
+        Las llamadas de red (mercado, financieros, shares) de distintos tickers
+        se solapan; cada ticker se procesa con collect_company_data.
+        Con bulk_market=True los precios se descargan antes en bloques de
+        market_chunk_size tickers (los que falten se piden uno a uno).
+        
+        Returns:
+            dict con 'results' (ticker -> result), 'errors' (ticker -> lista de
+            errores), 'stats' (tiempo total y throughput en tickers/segundo) y
+            'report' (métricas de la corrida; también en report_path si se da)
+        """
+        tickers = list(dict.fromkeys(tickers))  # Sin duplicados, mismo orden
+        results = {}
+        errors = {}
+        
+        self._log(f"\n🚀 Recolectando {len(tickers)} empresas con {max_workers} workers")
+        t0 = perf_counter()
+        
+        market_data = {}
+        if bulk_market:
+            market_data = self.get_yahoo_market_data_bulk(tickers, start, end, market_chunk_size)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self.collect_company_data, ticker, start, end,
+                                market_data.get(ticker)): ticker
+                for ticker in tickers
+            }
+            for i, future in enumerate(as_completed(futures), 1):
+                ticker = futures[future]
+                try:
+                    result = future.result()
+                    results[ticker] = result
+                    if result['errors']:
+                        errors[ticker] = result['errors']
+                except Exception as e:
+                    self._record_error(ticker, 'collect', e)
+                    errors[ticker] = [self.errors[-1]]
+                    self._log(f"❌ Error con {ticker}: {e}")
+                
+                if i % 100 == 0:
+                    self._log(f"✅ Progreso: {i}/{len(tickers)} empresas")
+        
+        elapsed = perf_counter() - t0
+        stats = {
+            'n_tickers': len(tickers),
+            'n_ok': sum(1 for t in results if t not in errors),
+            'n_errors': len(errors),
+            'elapsed_seconds': elapsed,
+            'tickers_per_second': len(tickers) / elapsed if elapsed > 0 else float('nan'),
+        }
+        
+        self._log(f"\n✅ Universo completado: {stats['n_ok']}/{len(tickers)} sin errores")
+        self._log(f"   Tiempo: {elapsed:.1f}s ({stats['tickers_per_second']:.2f} tickers/s)")
+        
+        report = self.run_report(report_path, extra={'stats': stats})
+        return {'results': results, 'errors': errors, 'stats': stats, 'report': report}
+    
+    # ===== TRABAJOS REANUDABLES =====
+    
+    def _job_yahoo(self, ticker, manifest, storage, start, end):
+        """Paso Yahoo de un ticker del trabajo; retorna financial_data o None"""
+        result = self.collect_company_data(ticker, start, end, alpha_vantage=False)
+        if result['market_data'] is None or result['errors']:
+            reason = '; '.join(e['error'] for e in result['errors']) or 'sin datos de mercado'
+            manifest.mark_failed(ticker, 'yahoo', reason)
+            return None
+        self.save_data(result, storage=storage)
+        manifest.mark_done(ticker, 'yahoo', quality=result['data_quality']['overall_score'])
+        return result['financial_data']
+    
+    def _job_alpha_vantage(self, ticker, manifest, storage, financial_data):
+        """
+        Paso Alpha Vantage de un ticker del trabajo. Si se agotó la cuota
+        queda 'deferred' hasta que el limitador libere un cupo; los estados
+        que sí llegaron quedan en la cache y no se vuelven a pagar.
+        
+        Un estado que Alpha Vantage contestó sin reportes (ticker sin
+        cobertura) no es un fallo: reintentarlo solo gastaría cuota, así que
+        queda 'done' con no_coverage. mark_failed es para errores de red/HTTP
+        y avisos de la API.
+        """
+        if financial_data is None and storage.exists('financial', ticker):
+            financial_data = storage.read('financial', [ticker]).drop(columns='ticker')
+        if financial_data is None or not self.use_hybrid:
+            manifest.mark_done(ticker, 'alpha_vantage', statements=[])
+            return
+        
+        n_errors = len(self.errors)
+        av = self.supplement_alpha_vantage(ticker, financial_data)
+        unanswered = [s for s in av['statements'] if av['supplement'].get(s) is None]
+        if unanswered and self.av_limiter.remaining_today == 0:
+            manifest.mark_deferred(ticker, 'alpha_vantage', self.av_limiter.next_daily_slot,
+                                   f"cuota diaria agotada ({', '.join(unanswered)})")
+            return
+        
+        errors = [e for e in self.errors[n_errors:] if e['ticker'] == ticker]
+        failed = [s for s in unanswered
+                  if any(e['source'] == f'av_{s}' or (e['source'] == 'alpha_vantage' and
+                         e['error'].startswith(ALPHA_VANTAGE_FUNCTIONS[s])) for e in errors)]
+        if failed:
+            manifest.mark_failed(ticker, 'alpha_vantage', f"sin respuesta para {', '.join(failed)}")
+            return
+        
+        if av['statements']:
+            storage.write('financial', ticker, av['financial_data'])
+            for statement, df in av['supplement'].items():
+                if df is not None:
+                    storage.write(f'av_{statement}', ticker, df)
+        manifest.mark_done(ticker, 'alpha_vantage', statements=av['statements'],
+                           filled=sum(av['filled'].values()), no_coverage=unanswered)
+    
+    @staticmethod
+    def _job_next_due(manifest, tickers):
+        """Próximo intento programado (AV solo cuenta si Yahoo ya terminó)"""
+        times = [manifest.next_due(tickers, ['yahoo']),
+                 manifest.next_due([t for t in tickers if manifest.status(t, 'yahoo') == DONE],
+                                   ['alpha_vantage'])]
+        times = [t for t in times if t is not None]
+        return min(times) if times else None
+    
+    def _job_ticker(self, ticker, manifest, storage, start, end):
+        financial_data = None
+        if manifest.is_due(ticker, 'yahoo'):
+            financial_data = self._job_yahoo(ticker, manifest, storage, start, end)
+        if manifest.status(ticker, 'yahoo') == DONE and manifest.is_due(ticker, 'alpha_vantage'):
+            self._job_alpha_vantage(ticker, manifest, storage, financial_data)
+    
+    def run_collection_job(self, tickers, manifest_path="../data/jobs/collect_manifest.jsonl",
+                           start="2016-01-01", end="2023-12-31", max_workers=8,
+                           output_dir="../data/raw", storage=None, max_attempts=5,
+                           backoff_base=60, max_wait=300, report_path=None):
+        """
+        Recolección reanudable de un universo grande.
+        
+        El manifiesto (JobManifest) guarda el estado de cada ticker en Yahoo y
+        en Alpha Vantage, y cada ticker se guarda en storage apenas termina.
+        Al relanzar con el mismo manifest_path:
+        - lo que quedó 'done' no se vuelve a pedir
+        - los fallos se reintentan con backoff exponencial (backoff_base * 2^n)
+        - los complementos de AV sin cuota quedan 'deferred' hasta el día
+          siguiente de cuota (el trabajo termina y se retoma en otra corrida)
+        
+        Dentro de una corrida se espera a los reintentos que venzan en menos
+        de max_wait segundos; el resto queda para la próxima.
+        
+        Returns:
+            dict con 'summary' (fuente -> {estado: cantidad}), 'next_due'
+            (epoch del próximo intento pendiente o None) y 'report'
+        """
+        tickers = list(dict.fromkeys(tickers))
+        storage = self._get_storage(output_dir, storage)
+        params = {'start': start, 'end': end, 'hybrid': self.use_hybrid}
+        
+        with JobManifest(manifest_path, params=params, max_attempts=max_attempts,
+                         backoff_base=backoff_base) as manifest:
+            manifest.add(tickers)
+            self._log(f"\n🚀 Trabajo reanudable: {len(tickers)} tickers ({manifest_path})")
+            for source, counts in manifest.summary(tickers).items():
+                self._log(f"   {source}: {counts}")
+            
+            while True:
+                if self.use_hybrid and self.av_limiter.remaining_today > 0:
+                    manifest.release_deferred('alpha_vantage')
+                pending = [t for t in tickers if manifest.is_due(t, 'yahoo') or (
+                    manifest.status(t, 'yahoo') == DONE and manifest.is_due(t, 'alpha_vantage'))]
+                if not pending:
+                    next_due = self._job_next_due(manifest, tickers)
+                    if next_due is None or next_due - time() > max_wait:
+                        break
+                    sleep(max(next_due - time(), 0))
+                    continue
+                
+                self._log(f"\n🔄 Ronda: {len(pending)} tickers pendientes")
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    futures = {executor.submit(self._job_ticker, ticker, manifest, storage, start, end): ticker
+                               for ticker in pending}
+                    for i, future in enumerate(as_completed(futures), 1):
+                        ticker = futures[future]
+                        try:
+                            future.result()
+                        except Exception as e:
+                            self._record_error(ticker, 'job', e)
+                            source = 'alpha_vantage' if manifest.status(ticker, 'yahoo') == DONE else 'yahoo'
+                            manifest.mark_failed(ticker, source, e)
+                            self._log(f"❌ Error con {ticker}: {e}")
+                        if i % 100 == 0:
+                            self._log(f"✅ Progreso: {i}/{len(pending)} tickers")
+            
+            summary = manifest.summary(tickers)
+            next_due = self._job_next_due(manifest, tickers)
+        
+        self._log(f"\n✅ Trabajo detenido")
+        for source, counts in summary.items():
+            self._log(f"   {source}: {counts}")
+        if next_due is not None:
+            self._log(f"   Próximo intento: {datetime.fromtimestamp(next_due):%Y-%m-%d %H:%M}")
+        
+        report = self.run_report(report_path, extra={'job': summary})
+        return {'summary': summary, 'next_due': next_due, 'report': report}
+    
     def _calculate_data_quality(self, result):
         """Calcula métricas de calidad de los datos recolectados"""
         quality = {
@@ -345,33 +934,36 @@ class HybridDataCollector:
         
         return quality
     
-    def save_data(self, result, output_dir="../data/raw"):
-        """Guarda los datos recolectados"""
-        os.makedirs(output_dir, exist_ok=True)
+    def _get_storage(self, output_dir, storage):
+        """Backend explícito > backend del collector > CSV en output_dir"""
+        return storage or self.storage or CsvStorage(output_dir)
+    
+    @instrumented('save')
+    def save_data(self, result, output_dir="../data/raw", storage=None):
+        """Guarda los datos recolectados (CSV en output_dir o el backend dado)"""
+        storage = self._get_storage(output_dir, storage)
+        os.makedirs(storage.root, exist_ok=True)
         ticker = result['ticker']
         
         # Guardar datos de mercado
         if result['market_data'] is not None:
-            market_path = f"{output_dir}/{ticker}_market_data.csv"
-            result['market_data'].to_csv(market_path, index=False)
-            print(f"💾 Guardado: {market_path}")
+            market_path = storage.write('market', ticker, result['market_data'])
+            self._log(f"💾 Guardado: {market_path}")
         
         # Guardar datos financieros
         if result['financial_data'] is not None:
-            financial_path = f"{output_dir}/{ticker}_financial_data.csv"
-            result['financial_data'].to_csv(financial_path, index=False)
-            print(f"💾 Guardado: {financial_path}")
+            financial_path = storage.write('financial', ticker, result['financial_data'])
+            self._log(f"💾 Guardado: {financial_path}")
         
         # Guardar datos de Alpha Vantage (si existen)
         if result['alpha_vantage_supplement']:
             for key, df in result['alpha_vantage_supplement'].items():
                 if df is not None:
-                    av_path = f"{output_dir}/{ticker}_av_{key}.csv"
-                    df.to_csv(av_path, index=False)
-                    print(f"💾 Guardado: {av_path}")
+                    av_path = storage.write(f'av_{key}', ticker, df)
+                    self._log(f"💾 Guardado: {av_path}")
         
         # Guardar reporte de calidad
-        quality_path = f"{output_dir}/{ticker}_quality_report.txt"
+        quality_path = f"{storage.root}/{ticker}_quality_report.txt"
         with open(quality_path, 'w') as f:
             f.write(f"Reporte de Calidad - {ticker}\n")
             f.write(f"Generado: {result['timestamp']}\n")
@@ -382,7 +974,84 @@ class HybridDataCollector:
             f.write(f"Suplemento Alpha Vantage: {'✅' if result['data_quality']['av_supplemented'] else '❌'}\n")
             f.write(f"\nScore General: {result['data_quality']['overall_score']:.1f}%\n")
         
-        print(f"💾 Guardado: {quality_path}")
+        self._log(f"💾 Guardado: {quality_path}")
+    
+    # ===== ACTUALIZACIÓN INCREMENTAL =====
+    
+    def _update_ticker_market_data(self, ticker, storage, end, overlap_days, full_start):
+        """Actualiza un ticker; retorna (estado, filas_nuevas)"""
+        if not storage.exists('market', ticker):
+            df = self.get_yahoo_market_data(ticker, full_start, end)
+            if df is None:
+                return 'no_data', 0
+            storage.write('market', ticker, df)
+            return 'full', len(df)
+        
+        stored_tail = storage.tail('market', ticker, overlap_days + 1)
+        stored_tail['day'] = stored_tail['Date'].astype(str).str[:10]
+        last_day = stored_tail['day'].iloc[-1]
+        
+        # Pedir solo la cola, con solape para detectar ajustes retroactivos
+        tail_start = (pd.Timestamp(last_day) - pd.Timedelta(days=overlap_days)).strftime('%Y-%m-%d')
+        if tail_start >= end:
+            return 'up_to_date', 0
+        new = self.get_yahoo_market_data(ticker, tail_start, end)
+        if new is None:
+            return 'up_to_date', 0
+        new['day'] = new['Date'].astype(str).str[:10]
+        
+        # Splits/dividendos: Yahoo re-ajusta toda la historia hacia atrás, así
+        # que si el solape no coincide o hay eventos nuevos se re-descarga todo
+        overlap = stored_tail.merge(new[['day', 'Close']], on='day', suffixes=('', '_new'))
+        mismatch = not np.allclose(overlap['Close'], overlap['Close_new'], rtol=1e-6)
+        fresh = new[new['day'] > last_day]
+        events = [c for c in ('Dividends', 'Stock Splits') if c in fresh.columns]
+        has_events = bool(events) and (fresh[events].fillna(0) != 0).any().any()
+        
+        if mismatch or has_events:
+            first_day = str(storage.first_date('market', ticker))[:10]
+            df = self.get_yahoo_market_data(ticker, first_day, end)
+            if df is None:
+                return 'error', 0
+            storage.write('market', ticker, df)
+            return 'readjusted', len(df)
+        
+        if fresh.empty:
+            return 'up_to_date', 0
+        
+        storage.append('market', ticker, fresh.drop(columns='day'))
+        return 'appended', len(fresh)
+    
+    @instrumented('market_update')
+    def update_market_data(self, tickers, output_dir="../data/raw", end=None,
+                           overlap_days=7, full_start="2016-01-01", storage=None):
+        """
+        Actualización incremental de los precios guardados: solo se piden
+        los días posteriores a la última fecha guardada (más un pequeño
+        solape para detectar ajustes por splits/dividendos).
+        
+        Returns:
+            dict ticker -> {'status': ..., 'rows': filas escritas}
+        """
+        storage = self._get_storage(output_dir, storage)
+        end = end or (pd.Timestamp.today().normalize() + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+        summary = {}
+        
+        for ticker in tickers:
+            try:
+                status, rows = self._update_ticker_market_data(ticker, storage, end, overlap_days, full_start)
+            except Exception as e:
+                self._log(f"❌ Error actualizando {ticker}: {e}")
+                self._record_error(ticker, 'market_update', e)
+                status, rows = 'error', 0
+            summary[ticker] = {'status': status, 'rows': rows}
+        
+        counts = pd.Series([v['status'] for v in summary.values()]).value_counts()
+        self._log(f"\n✅ Actualización incremental: {len(tickers)} tickers")
+        for status, n in counts.items():
+            self._log(f"   {status}: {n}")
+        
+        return summary
 
 
 # ===== FUNCIÓN DE AYUDA =====
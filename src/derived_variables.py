@@ -0,0 +1,244 @@
+"""
+Motor de Variables Derivadas
+Convierte las fórmulas de VARIABLES_DERIVADAS en un grafo ejecutable
+
+- Parsea cada fórmula ("Net Debt = debt - cash") a un árbol de expresión
+- Ordena las variables topológicamente (debt antes que netdebt antes que bev/mev)
+- Elimina subexpresiones comunes (cada subárbol se evalúa una sola vez)
+- Evalúa solo los nodos que necesitan las variables pedidas, vectorizado
+"""
+
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.diccionario_variables import VARIABLES_DERIVADAS, VARIABLES_CERO_SI_FALTA
+
+_TOKEN = re.compile(r"\s*(?:([A-Za-z_][A-Za-z0-9_]*)|(.))")
+
+# Funciones permitidas en las fórmulas
+FUNCIONES = {"change"}
+
+
+# ===== PARSER =====
+
+def _tokenize(expr):
+    tokens = []
+    for name, op in _TOKEN.findall(expr):
+        if name:
+            tokens.append(("name", name))
+        elif op.strip():
+            if op not in "+-*/()":
+                raise ValueError(f"Símbolo no soportado '{op}' en: {expr}")
+            tokens.append(("op", op))
+    return tokens
+
+
+def parse_formula(formula):
+    """
+    "Net Debt = debt - cash" -> ('-', ('var', 'debt'), ('var', 'cash'))
+
+    Nodos: ('var', nombre), ('call', función, arg), (op, izq, der)
+    """
+    expr = formula.split("=", 1)[1] if "=" in formula else formula
+    tokens = _tokenize(expr)
+    pos = 0
+
+    def peek():
+        return tokens[pos] if pos < len(tokens) else (None, None)
+
+    def take():
+        nonlocal pos
+        pos += 1
+        return tokens[pos - 1]
+
+    def expression():
+        node = term()
+        while peek() in (("op", "+"), ("op", "-")):
+            node = (take()[1], node, term())
+        return node
+
+    def term():
+        node = factor()
+        while peek() in (("op", "*"), ("op", "/")):
+            node = (take()[1], node, factor())
+        return node
+
+    def factor():
+        kind, value = take() if pos < len(tokens) else (None, None)
+        if kind == "name":
+            if peek() == ("op", "("):
+                if value not in FUNCIONES:
+                    raise ValueError(f"Función desconocida '{value}' en: {formula}")
+                take()
+                arg = expression()
+                if take() != ("op", ")"):
+                    raise ValueError(f"Falta ')' en: {formula}")
+                return ("call", value, arg)
+            return ("var", value)
+        if (kind, value) == ("op", "("):
+            node = expression()
+            if take() != ("op", ")"):
+                raise ValueError(f"Falta ')' en: {formula}")
+            return node
+        raise ValueError(f"Fórmula inválida: {formula}")
+
+    node = expression()
+    if pos != len(tokens):
+        raise ValueError(f"Sobran símbolos en: {formula}")
+    return node
+
+
+def _variables(node):
+    """Variables referenciadas por un árbol"""
+    if node[0] == "var":
+        return {node[1]}
+    if node[0] == "call":
+        return _variables(node[2])
+    return _variables(node[1]) | _variables(node[2])
+
+
+def _canonical(node):
+    """Clave canónica de un subárbol (+ y * son conmutativos)"""
+    if node[0] == "var":
+        return node[1]
+    if node[0] == "call":
+        return f"{node[1]}({_canonical(node[2])})"
+    left, right = _canonical(node[1]), _canonical(node[2])
+    if node[0] in "+*" and right < left:
+        left, right = right, left
+    return f"({left}{node[0]}{right})"
+
+
+# ===== MOTOR =====
+
+class DerivedVariableEngine:
+    """
+    Grafo de variables derivadas.
+
+    Ejemplo:
+        engine = DerivedVariableEngine()
+        df = engine.evaluate(df, ["bev", "noa"])
+    """
+
+    def __init__(self, definitions=None, zero_if_missing=None):
+        definitions = VARIABLES_DERIVADAS if definitions is None else definitions
+        self.zero_if_missing = set(VARIABLES_CERO_SI_FALTA if zero_if_missing is None
+                                   else zero_if_missing)
+        self.formulas = {code: parse_formula(text) for code, text in definitions.items()}
+        self.dependencies = {code: _variables(node) for code, node in self.formulas.items()}
+        self.order = self._topological_order()
+        self.unavailable = {}
+
+    def _topological_order(self):
+        """Kahn: cada variable derivada después de las derivadas que usa"""
+        pending = {code: {d for d in deps if d in self.formulas}
+                   for code, deps in self.dependencies.items()}
+        order = []
+        ready = [code for code, deps in pending.items() if not deps]
+        while ready:
+            code = ready.pop(0)
+            order.append(code)
+            for other, deps in pending.items():
+                if code in deps:
+                    deps.discard(code)
+                    if not deps and other not in order and other not in ready:
+                        ready.append(other)
+        cycle = set(self.formulas) - set(order)
+        if cycle:
+            raise ValueError(f"Dependencia circular entre: {', '.join(sorted(cycle))}")
+        return order
+
+    def required_nodes(self, targets):
+        """Variables derivadas necesarias para calcular targets (en orden)"""
+        needed = set()
+        stack = [t for t in targets if t in self.formulas]
+        while stack:
+            code = stack.pop()
+            if code not in needed:
+                needed.add(code)
+                stack.extend(d for d in self.dependencies[code] if d in self.formulas)
+        return [code for code in self.order if code in needed]
+
+    def plan(self, targets, columns):
+        """
+        Nodos a evaluar y nodos imposibles (con las variables base que faltan).
+        Una columna que ya existe en el DataFrame no se recalcula.
+        """
+        columns = set(columns)
+        available = set(columns) | self.zero_if_missing
+        nodes, unavailable = [], {}
+        for code in self.required_nodes(targets):
+            if code in columns:
+                continue
+            missing = sorted(d for d in self.dependencies[code]
+                             if d not in available and d not in nodes)
+            if missing:
+                unavailable[code] = missing
+            else:
+                nodes.append(code)
+        return nodes, unavailable
+
+    def evaluate(self, df, targets=None, by="ticker"):
+        """
+        Agrega a df las variables derivadas pedidas (por defecto todas).
+
+        change(x) es la diferencia respecto al registro anterior del mismo
+        `by` (el DataFrame debe venir ordenado por fecha dentro de cada grupo).
+        Las variables imposibles de calcular quedan en self.unavailable.
+        """
+        targets = list(targets or self.order)
+        nodes, self.unavailable = self.plan(targets, df.columns)
+
+        codes = pd.factorize(df[by])[0] if by in df.columns else np.zeros(len(df), dtype=int)
+        values = {}
+        memo = {}
+
+        def lookup(name):
+            if name in values:
+                return values[name]
+            if name in df.columns:
+                values[name] = df[name].to_numpy(dtype=float)
+                if name in self.zero_if_missing:
+                    values[name] = np.nan_to_num(values[name], nan=0.0)
+            elif name in self.zero_if_missing:
+                values[name] = np.zeros(len(df))
+            return values[name]
+
+        def run(node):
+            key = _canonical(node)
+            if key in memo:
+                return memo[key]
+            if node[0] == "var":
+                result = lookup(node[1])
+            elif node[0] == "call":
+                arg = run(node[2])
+                result = pd.Series(arg).groupby(codes, sort=False).diff().to_numpy()
+            else:
+                left, right = run(node[1]), run(node[2])
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    if node[0] == "+":
+                        result = left + right
+                    elif node[0] == "-":
+                        result = left - right
+                    elif node[0] == "*":
+                        result = left * right
+                    else:
+                        result = left / right
+            memo[key] = result
+            return result
+
+        for code in nodes:
+            values[code] = run(self.formulas[code])
+
+        new = {code: values[code] for code in nodes}
+        return df.assign(**new)
+
+
+def compute_derived(df, targets=None, by="ticker"):
+    """Atajo: evalúa las variables derivadas con las definiciones del diccionario"""
+    return DerivedVariableEngine().evaluate(df, targets, by=by)
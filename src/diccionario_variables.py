@@ -50,6 +50,7 @@ MAPEO_CONTABLE_YAHOO = {
     # Balance Sheet - Equity
     "pstk": "Preferred Stock",
     "seq": "Stockholders Equity",
+    "re": "Retained Earnings",
     
     # Cash Flow Statement
     "capx": "Capital Expenditure",
@@ -89,12 +90,28 @@ MAPEO_CONTABLE_ALPHA_VANTAGE = {
     "debtst": "shortTermDebt",
     "debtlt": "longTermDebt",
     "seq": "totalShareholderEquity",
+    "re": "retainedEarnings",
     
     # Cash Flow
     "ocf": "operatingCashflow",
     "capx": "capitalExpenditures",
 }
 
+# Estado financiero de Alpha Vantage que contiene cada código
+# (INCOME_STATEMENT, BALANCE_SHEET, CASH_FLOW)
+
+ESTADOS_ALPHA_VANTAGE = {
+    "income": ["sale", "cogs", "gp", "ebitda", "ebit", "int", "pi", "tax", "ni", "xrd", "xsga"],
+    "balance": ["at", "ca", "cash", "rec", "inv", "ppen", "intan", "lt", "cl",
+                "debtst", "debtlt", "seq", "re"],
+    "cashflow": ["ocf", "capx"],
+}
+
+# Alpha Vantage reporta el CapEx en positivo; Yahoo lo trae como salida de caja (negativo)
+SIGNO_ALPHA_VANTAGE_A_YAHOO = {
+    "capx": -1,
+}
+
 # ===== VARIABLES DERIVADAS =====
 # Estas se calculan a partir de las básicas
 
@@ -114,12 +131,16 @@ VARIABLES_DERIVADAS = {
     "oa": "Operating Assets = coa + ncoa",
     "ol": "Operating Liabilities = col + ncol",
     "noa": "Net Operating Assets = oa - ol",
+    "ffo": "Funds From Operations = pi + dp",
     "oacc": "Operating Accruals = ni - ocf",
     "tacc": "Total Accruals = oacc + change(nfna)",
     "bev": "Book Enterprise Value = seq + netdebt",
     "mev": "Market Enterprise Value = me + netdebt",
 }
 
+# Variables que en el paper se toman como 0 cuando no se reportan
+VARIABLES_CERO_SI_FALTA = ["txditc", "pstk", "ivao"]
+
 # ===== CARACTERÍSTICAS DEL PAPER (120 Principales) =====
 
 CARACTERISTICAS_DISPONIBLES = {
@@ -241,23 +262,60 @@ VARIABLES_CRITICAS = [
     "ocf",     # Operating Cash Flow
 ]
 
+# ===== ÍNDICES INVERSOS (precalculados) =====
+# Nombre de columna de la fuente -> código del paper, para búsquedas O(1)
+
+INDICE_INVERSO = {
+    "yahoo": {col: code for code, col in MAPEO_CONTABLE_YAHOO.items()},
+    "alpha_vantage": {col: code for code, col in MAPEO_CONTABLE_ALPHA_VANTAGE.items()},
+}
+
+MAPEOS_DIRECTOS = {
+    "yahoo": MAPEO_CONTABLE_YAHOO,
+    "alpha_vantage": MAPEO_CONTABLE_ALPHA_VANTAGE,
+}
+
 # ===== FUNCIONES HELPER =====
 
-def get_paper_code(yahoo_column):
-    """Convierte nombre de columna de Yahoo a código del paper"""
-    for code, yahoo_name in MAPEO_CONTABLE_YAHOO.items():
-        if yahoo_name == yahoo_column:
-            return code
-    return None
+def get_paper_code(column, source="yahoo"):
+    """Convierte nombre de columna de Yahoo (o Alpha Vantage) a código del paper"""
+    return INDICE_INVERSO[source].get(column)
 
 def get_yahoo_column(paper_code):
     """Convierte código del paper a nombre de columna de Yahoo"""
     return MAPEO_CONTABLE_YAHOO.get(paper_code, None)
 
+def get_source_column(paper_code, source="yahoo"):
+    """Convierte código del paper a nombre de columna en la fuente dada"""
+    return MAPEOS_DIRECTOS[source].get(paper_code)
+
+def rename_to_paper_codes(df, source="yahoo", keep=None, drop_unmapped=True):
+    """
+    Renombra un estado financiero crudo a códigos del paper en una operación.
+    
+    Args:
+        df: DataFrame con columnas de Yahoo ("Total Assets"...) o Alpha Vantage
+        source: "yahoo" o "alpha_vantage"
+        keep: columnas que se conservan sin mapear (p.ej. ["Date", "ticker"])
+        drop_unmapped: si True, las demás columnas sin código se eliminan
+    
+    Returns:
+        (DataFrame renombrado, lista de columnas sin mapeo)
+    """
+    index = INDICE_INVERSO[source]
+    keep = set(keep or ())
+    renames = {col: index[col] for col in df.columns if col in index}
+    unmapped = [col for col in df.columns if col not in renames and col not in keep]
+    
+    if drop_unmapped and unmapped:
+        df = df.drop(columns=unmapped)
+    return df.rename(columns=renames), unmapped
+
 def check_data_availability(df_columns):
     """Verifica qué variables críticas están disponibles"""
     available = []
     missing = []
+    df_columns = set(df_columns)
     
     for var_code in VARIABLES_CRITICAS:
         yahoo_col = get_yahoo_column(var_code)
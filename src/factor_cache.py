@@ -0,0 +1,117 @@
+"""
+Cache de Factores Calculados
+Solo se recalculan los tickers cuyos datos de entrada (o fórmulas) cambiaron
+
+La clave de cada ticker combina:
+- la huella (hash) de su partición de entrada: todas las filas y columnas del
+  panel PIT de ese ticker
+- FACTOR_VERSION y la lista de factores pedidos
+
+Se guarda sobre ResponseCache (mismo formato en disco, desalojo LRU por
+tamaño y estadísticas hits/misses/evictions).
+"""
+
+import hashlib
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.factor_calculator import FactorCalculator, DEFAULT_FACTORS, FACTOR_VERSION
+from src.response_cache import ResponseCache
+
+
+def _ticker_bounds(tickers):
+    """{ticker: (inicio, fin)} de cada bloque contiguo (panel ordenado por ticker)"""
+    bounds = np.flatnonzero(tickers[1:] != tickers[:-1]) + 1
+    starts = np.concatenate([[0], bounds]) if len(tickers) else []
+    ends = np.concatenate([bounds, [len(tickers)]]) if len(tickers) else []
+    return {tickers[start]: (start, end) for start, end in zip(starts, ends)}
+
+
+def partition_fingerprints(panel, ticker_col='ticker'):
+    """
+    Huella de la partición de cada ticker (el panel debe venir ordenado por
+    ticker y fecha). Un solo hash vectorizado por fila; después sha256 por ticker.
+
+    Returns:
+        dict ticker -> hex digest
+    """
+    columns = sorted(panel.columns)
+    row_hashes = pd.util.hash_pandas_object(panel[columns], index=False).to_numpy()
+    schema = repr([(c, str(panel[c].dtype)) for c in columns]).encode('utf-8')
+    return {ticker: hashlib.sha256(schema + row_hashes[start:end].tobytes()).hexdigest()
+            for ticker, (start, end) in _ticker_bounds(panel[ticker_col].to_numpy()).items()}
+
+
+class FactorCache:
+    """
+    Resultado de FactorCalculator.compute guardado por ticker.
+
+    Ejemplo:
+        cache = FactorCache("../data/cache/factors")
+        result = cache.compute(panel)
+        print(cache.stats)
+    """
+
+    def __init__(self, cache_dir="../data/cache/factors", max_bytes=2 * 1024 ** 3,
+                 calculator=None, version=FACTOR_VERSION):
+        self.cache = ResponseCache(cache_dir, max_bytes=max_bytes)
+        self.calculator = calculator or FactorCalculator(verbose=False)
+        self.version = version
+
+    @property
+    def stats(self):
+        return self.cache.stats
+
+    def _endpoint(self, factors):
+        return f"v{self.version}:{','.join(sorted(factors))}"
+
+    def compute(self, panel, factors=None):
+        """
+        Igual que FactorCalculator.compute, pero los tickers con la misma
+        partición de entrada que en una corrida anterior salen de la cache.
+        """
+        factors = list(factors or DEFAULT_FACTORS)
+        ticker_col = self.calculator.ticker_col
+        endpoint = self._endpoint(factors)
+
+        df = panel.sort_values([ticker_col, self.calculator.date_col],
+                               kind='stable').reset_index(drop=True)
+        bounds = _ticker_bounds(df[ticker_col].to_numpy())
+        fingerprints = partition_fingerprints(df, ticker_col)
+
+        cached = {}
+        for ticker, fingerprint in fingerprints.items():
+            value = self.cache.get('factors', endpoint, ticker, 'factors',
+                                   start=fingerprint, default=None)
+            if value is not None:
+                cached[ticker] = value
+
+        missing = ~df[ticker_col].isin(list(cached)).to_numpy()
+        values = {}
+
+        def column(name):
+            if name not in values:
+                values[name] = np.full(len(df), np.nan)
+            return values[name]
+
+        if missing.any():
+            computed = self.calculator.compute(df[missing], factors)
+            new = {c: computed[c].to_numpy(dtype=float)
+                   for c in computed.columns if c not in df.columns}  # Incluye intermedios
+            for name, array in new.items():
+                column(name)[missing] = array
+
+            for ticker, (start, end) in _ticker_bounds(computed[ticker_col].to_numpy()).items():
+                entry = {name: array[start:end] for name, array in new.items()}
+                self.cache.put('factors', endpoint, ticker, entry, start=fingerprints[ticker])
+
+        for ticker, entry in cached.items():
+            start, end = bounds[ticker]
+            for name, array in entry.items():
+                column(name)[start:end] = array
+
+        return df.assign(**values)
@@ -0,0 +1,265 @@
+"""
+Calculadora de Factores - Panel (ticker x fecha)
+Basado en Jensen, Kelly & Pedersen (2023) - Global Factor Data
+
+Calcula las características del notebook 03 para todo el universo a la vez,
+con operaciones agrupadas de pandas/NumPy (sin loops por ticker).
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from time import perf_counter
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.derived_variables import compute_derived
+from src.growth import GROWTH_FACTORS, compute_growth
+
+# Subir al cambiar cualquier fórmula: invalida los factores guardados en cache
+FACTOR_VERSION = 2
+
+# ===== DEFINICIÓN DE FACTORES =====
+# factor -> columnas (o factores) de las que depende
+
+FACTOR_DEPENDENCIES = {
+    # Tamaño y valor
+    "me": ["Close", "shares_outstanding"],
+    "be": ["seq"],  # + txditc - pstk (cero si faltan), ver VARIABLES_DERIVADAS
+    "be_me": ["be", "me"],
+
+    # Rentabilidad
+    "gp": ["sale", "cogs"],
+    "gp_at": ["gp", "at"],
+    "op_at": ["ebit", "at"],
+    "roa": ["ni", "at"],
+    "roe": ["ni", "be"],
+
+    # Inversión y crecimiento (a nivel reporte, ver src/growth.py)
+    "at_gr1": ["at", "date_accounting"],
+    "at_gr3": ["at", "date_accounting"],
+    "sale_gr1": ["sale", "date_accounting"],
+    "sale_gr3": ["sale", "date_accounting"],
+    "capx_gr1": ["capx", "date_accounting"],
+    "capx_gr3": ["capx", "date_accounting"],
+    "inv_gr1": ["inv", "date_accounting"],
+    "be_gr1": ["be", "date_accounting"],
+    "debt_gr1": ["debtlt", "debtst", "date_accounting"],
+    "noa_gr1a": ["at", "ca", "cash", "cl", "debtst", "lt", "debtlt", "date_accounting"],
+    "cowc_gr1a": ["at", "ca", "cash", "cl", "debtst", "date_accounting"],
+    "inv_at": ["capx", "at"],
+
+    # Apalancamiento y liquidez
+    "debt_at": ["lt", "at"],
+    "cash_at": ["cash", "at"],
+
+    # Eficiencia
+    "sale_at": ["sale", "at"],
+    "sale_inv": ["sale", "inv"],
+    "sale_rect": ["sale", "rec"],
+
+    # Precio y momentum
+    "ret_daily": ["Close"],
+    "ret_1m": ["Close"],
+    "ret_12m": ["Close"],
+    "vol_1m": ["ret_daily"],
+}
+
+DEFAULT_FACTORS = [
+    "me", "be", "be_me", "gp_at", "op_at", "roa", "roe", "at_gr1", "inv_at",
+    "debt_at", "cash_at", "sale_at", "sale_inv", "sale_rect",
+    "ret_1m", "ret_12m", "vol_1m",
+]
+
+
+class FactorCalculator:
+    """
+    Calcula factores sobre un panel largo (una fila por ticker y día de mercado).
+
+    El panel debe tener ticker_col, date_col y las columnas que pidan los
+    factores (Close, shares_outstanding, códigos del paper como at, sale, ni...).
+    Los factores cuyas columnas faltan se omiten y quedan en self.skipped.
+    Con metrics (RunMetrics) el tiempo de cada factor se registra como etapa
+    "factor:<nombre>".
+    """
+
+    def __init__(self, ticker_col="ticker", date_col="date_market", verbose=True, metrics=None):
+        self.ticker_col = ticker_col
+        self.date_col = date_col
+        self.verbose = verbose
+        self.metrics = metrics
+        self.skipped = {}
+
+    # ===== RESOLUCIÓN DE DEPENDENCIAS =====
+
+    def _resolve(self, factors, columns):
+        """Orden de cálculo (dependencias primero) y factores no calculables"""
+        order, skipped = [], {}
+
+        def visit(name, stack=()):
+            if name in columns or name in order:
+                return True
+            if name in skipped or name not in FACTOR_DEPENDENCIES:
+                return False
+            if name in stack:
+                raise ValueError(f"Dependencia circular en {name}")
+
+            missing = [d for d in FACTOR_DEPENDENCIES[name] if not visit(d, stack + (name,))]
+            if missing:
+                skipped[name] = f"faltan {', '.join(missing)}"
+                return False
+            order.append(name)
+            return True
+
+        for factor in factors:
+            if not visit(factor) and factor not in skipped:
+                skipped[factor] = "factor desconocido"
+        return order, skipped
+
+    # ===== OPERACIONES AGRUPADAS =====
+
+    def _group_shift(self, values, periods):
+        """shift dentro de cada ticker (el panel viene ordenado por ticker, fecha)"""
+        return values.groupby(self._codes, sort=False).shift(periods)
+
+    def _group_rolling_std(self, values, window):
+        """
+        Desviación estándar móvil por ticker sin groupby().rolling():
+        se calcula sobre toda la serie y se anulan las ventanas que cruzan
+        el borde entre dos tickers.
+        """
+        std = values.rolling(window, min_periods=window).std()
+        return std.where(self._position >= window - 1)
+
+    def _report_level(self, df, name):
+        """
+        Calcula un factor de crecimiento sobre los reportes únicos
+        (ticker, date_accounting) y lo lleva a cada día con el índice
+        fila -> reporte (se arma una sola vez por compute()).
+
+        El primer factor de crecimiento calcula de una vez todos los pedidos
+        (un solo compute_growth); el resto sale de self._growth.
+        """
+        keys = [self.ticker_col, "date_accounting"]
+        if self._reports is None:
+            # Numeración sin huecos solo sobre filas con reporte; NaT -> -1
+            idx = df.groupby(keys, sort=False, dropna=True).ngroup()
+            idx = idx.fillna(-1).to_numpy(dtype=np.int64)
+            _, first = np.unique(idx, return_index=True)
+            self._report_rows = first[idx[first] >= 0]
+            self._report_idx = idx
+            assert self._report_idx.max(initial=-1) < len(self._report_rows)
+            self._reports = df[keys].iloc[self._report_rows].reset_index(drop=True)
+
+        if name not in self._growth:
+            batch = [g for g in self._growth_requested if g not in self._growth]
+            for col in dict.fromkeys(c for g in batch for c in FACTOR_DEPENDENCIES[g]):
+                if col not in self._reports.columns:
+                    self._reports[col] = df[col].to_numpy()[self._report_rows]
+            result = compute_growth(self._reports, batch, self.ticker_col, "date_accounting")
+            for g in batch:
+                self._growth[g] = result[g].to_numpy()
+
+        values = self._growth[name]
+        if not len(values):
+            return np.full(len(df), np.nan)
+        out = values[np.clip(self._report_idx, 0, None)]
+        out[self._report_idx < 0] = np.nan
+        return out
+
+    # ===== FACTORES =====
+
+    def _compute_one(self, df, name):
+        if name == "me":
+            return df["Close"] * df["shares_outstanding"]
+        if name == "be":
+            # Misma fórmula que usa growth.py para be_gr1 (DerivedVariableEngine)
+            inputs = [c for c in ("seq", "txditc", "pstk") if c in df.columns]
+            return compute_derived(df[inputs], ["be"])["be"]
+        if name == "gp":
+            return df["sale"] - df["cogs"]
+        if name in GROWTH_FACTORS:
+            return self._report_level(df, name)
+        if name == "sale_inv":
+            return df["sale"] / df["inv"].replace(0, np.nan)
+        if name == "sale_rect":
+            return df["sale"] / df["rec"].replace(0, np.nan)
+        if name == "ret_daily":
+            return df["Close"] / self._group_shift(df["Close"], 1) - 1
+        if name == "ret_1m":
+            return df["Close"] / self._group_shift(df["Close"], 21) - 1
+        if name == "ret_12m":
+            return df["Close"] / self._group_shift(df["Close"], 252) - 1
+        if name == "vol_1m":
+            return self._group_rolling_std(df["ret_daily"], 21)
+
+        # Ratios simples numerador / denominador
+        numerator, denominator = FACTOR_DEPENDENCIES[name]
+        return df[numerator] / df[denominator]
+
+    def compute(self, panel, factors=None):
+        """
+        Calcula los factores pedidos (por defecto DEFAULT_FACTORS).
+
+        Returns:
+            Copia del panel ordenada por (ticker, fecha) con los factores
+            como columnas nuevas (inf -> NaN).
+        """
+        factors = list(factors or DEFAULT_FACTORS)
+        order, self.skipped = self._resolve(factors, set(panel.columns))
+        # Crecimiento al final (ningún factor depende de ellos): sus insumos
+        # (p.ej. be) ya están y se calculan todos en un solo compute_growth
+        order = ([name for name in order if name not in GROWTH_FACTORS]
+                 + [name for name in order if name in GROWTH_FACTORS])
+
+        df = panel.sort_values([self.ticker_col, self.date_col], kind="stable").reset_index(drop=True)
+        self._codes = pd.factorize(df[self.ticker_col])[0]
+        self._position = df.groupby(self._codes, sort=False).cumcount().to_numpy()
+        self._reports = None
+        self._growth = {}
+        self._growth_requested = [name for name in order if name in GROWTH_FACTORS]
+
+        t0 = perf_counter()
+        for name in order:
+            t_factor = perf_counter()
+            df[name] = self._compute_one(df, name)
+            if self.metrics is not None:
+                self.metrics.add_stage(f"factor:{name}", perf_counter() - t_factor, len(df))
+            if self.verbose:
+                print(f"✓ {name}")
+
+        df[order] = df[order].replace([np.inf, -np.inf], np.nan)
+
+        if self.verbose:
+            n_tickers = df[self.ticker_col].nunique()
+            print(f"\n✅ {len(order)} factores para {n_tickers} tickers "
+                  f"({len(df):,} filas) en {perf_counter() - t0:.2f}s")
+            for name, reason in self.skipped.items():
+                print(f"⚠️  {name} omitido: {reason}")
+
+        return df
+
+
+# ===== BENCHMARK =====
+
+def benchmark(universe_sizes=(10, 100, 1000, 3000), n_days=504, factors=None):
+    """Mide el tiempo de FactorCalculator.compute al crecer el universo"""
+    from src.synthetic import synthetic_panel
+
+    calc = FactorCalculator(verbose=False)
+    rows = []
+    for n_tickers in universe_sizes:
+        panel = synthetic_panel(n_tickers, n_days)
+        t0 = perf_counter()
+        calc.compute(panel, factors)
+        elapsed = perf_counter() - t0
+        rows.append({"tickers": n_tickers, "filas": len(panel), "segundos": elapsed,
+                     "filas_por_segundo": len(panel) / elapsed})
+        print(f"   {n_tickers:5d} tickers ({len(panel):>9,} filas): {elapsed:6.2f}s")
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    print("🧪 Benchmark de FactorCalculator (panel sintético, 2 años de días hábiles)")
+    benchmark()
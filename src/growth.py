@@ -0,0 +1,156 @@
+"""
+Crecimiento y Cambios de Variables Contables (at_gr1, sale_gr3, noa_gr1a...)
+Se calculan una vez por reporte y después se llevan a los días de mercado
+
+El notebook 03 calcula at_gr1 con drop_duplicates + shift + merge de vuelta al
+panel diario, y repite lo mismo para cada factor de crecimiento. Aquí:
+- Todas las variaciones salen de shifts agrupados sobre el frame de reportes
+- Las intermedias (be, debt, noa, cowc) vienen del DerivedVariableEngine
+- El resultado vuelve a los días con el índice de reportes (CompactPanel /
+  report_idx) o, si se calcula antes del merge PIT, con el propio merge_asof
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.derived_variables import DerivedVariableEngine
+from src.panel import CompactPanel
+
+# factor -> (variable, años hacia atrás, tipo)
+#   'pct': x_t / x_{t-k} - 1 (NaN si x_{t-k} <= 0)
+#   'at':  (x_t - x_{t-k}) / at_{t-k}   (sufijo "a" del paper: escalado por activos)
+GROWTH_FACTORS = {
+    "at_gr1": ("at", 1, "pct"),
+    "at_gr3": ("at", 3, "pct"),
+    "sale_gr1": ("sale", 1, "pct"),
+    "sale_gr3": ("sale", 3, "pct"),
+    "capx_gr1": ("capx", 1, "pct"),
+    "capx_gr3": ("capx", 3, "pct"),
+    "inv_gr1": ("inv", 1, "pct"),
+    "be_gr1": ("be", 1, "pct"),
+    "debt_gr1": ("debt", 1, "pct"),
+    "noa_gr1a": ("noa", 1, "at"),
+    "cowc_gr1a": ("cowc", 1, "at"),
+}
+
+
+def growth_inputs(factors):
+    """Variables (base o derivadas) que necesitan los factores pedidos"""
+    needed = []
+    for name in factors:
+        variable, _, kind = GROWTH_FACTORS[name]
+        for col in [variable] + (["at"] if kind == "at" else []):
+            if col not in needed:
+                needed.append(col)
+    return needed
+
+
+def report_lags(reports, columns, lags, ticker_col="ticker", date_col="date_fin"):
+    """
+    Valores actuales y rezagados (por reportes) de columns, con shifts agrupados.
+
+    Returns:
+        (order, current, {lag: DataFrame}) donde order ordena reports por
+        (ticker, fecha) y current / rezagos siguen ese orden
+    """
+    order = np.lexsort((reports[date_col].to_numpy(), pd.factorize(reports[ticker_col])[0]))
+    sorted_df = reports.iloc[order]
+    codes = pd.factorize(sorted_df[ticker_col])[0]
+    current = sorted_df[columns].astype(float).reset_index(drop=True)
+    grouped = current.groupby(codes, sort=False)
+    return order, current, {lag: grouped.shift(lag) for lag in lags}
+
+
+def restore_order(order, values):
+    """Inverso de report_lags: lleva un array ordenado al orden original"""
+    inverse = np.empty_like(order)
+    inverse[order] = np.arange(len(order))
+    return values[inverse]
+
+
+def compute_growth(reports, factors=None, ticker_col="ticker", date_col="date_fin",
+                   periods_per_year=1, engine=None):
+    """
+    Agrega los factores de crecimiento a un frame con una fila por reporte.
+
+    Args:
+        reports: (ticker_col, date_col, variables contables); p.ej. el output
+            de load_fundamentals o CompactPanel.reports
+        factors: subconjunto de GROWTH_FACTORS (por defecto todos)
+        periods_per_year: reportes por año (1 = anual; 4 = trimestral)
+        engine: DerivedVariableEngine para las intermedias (be, debt, noa...)
+
+    Returns:
+        Copia de reports (mismo orden) con una columna por factor calculable.
+        Los factores sin datos quedan en NaN.
+    """
+    factors = list(factors or GROWTH_FACTORS)
+    unknown = [f for f in factors if f not in GROWTH_FACTORS]
+    if unknown:
+        raise ValueError(f"Factores de crecimiento desconocidos: {', '.join(unknown)}")
+
+    engine = engine or DerivedVariableEngine()
+    inputs = growth_inputs(factors)
+    derived = [c for c in inputs if c not in reports.columns and c in engine.formulas]
+    df = engine.evaluate(reports, derived, by=ticker_col) if derived else reports
+
+    present = [c for c in inputs if c in df.columns]
+    years_back = sorted({GROWTH_FACTORS[f][1] for f in factors})
+    order, current, lagged = report_lags(df, present, [y * periods_per_year for y in years_back],
+                                         ticker_col, date_col)
+    lags = dict(zip(years_back, lagged.values()))
+
+    result = {}
+    for name in factors:
+        variable, years, kind = GROWTH_FACTORS[name]
+        if variable not in present or (kind == "at" and "at" not in present):
+            result[name] = np.full(len(df), np.nan)
+            continue
+        now, before = current[variable].to_numpy(), lags[years][variable].to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if kind == "pct":
+                values = np.where(before > 0, now / before - 1, np.nan)
+            else:
+                base = lags[years]["at"].to_numpy()
+                values = np.where(base > 0, (now - before) / base, np.nan)
+        values[~np.isfinite(values)] = np.nan
+        result[name] = values
+
+    out = reports.copy()
+    for name, values in result.items():
+        out[name] = restore_order(order, values)
+    return out
+
+
+def growth_stage(panel, factors=None, ticker_col="ticker", date_col="date_market",
+                 report_key="date_accounting", periods_per_year=1):
+    """
+    Factores de crecimiento para un panel diario (PIT) o un CompactPanel.
+
+    Los reportes se extraen una sola vez, se calculan los factores a nivel
+    reporte y se expanden a los días con report_idx (un take por columna,
+    sin merges).
+
+    Returns:
+        CompactPanel con los factores en .reports si la entrada era
+        CompactPanel; si no, copia del panel diario con las columnas nuevas.
+    """
+    factors = list(factors or GROWTH_FACTORS)
+    if isinstance(panel, CompactPanel):
+        compact = panel
+    else:
+        compact = CompactPanel.from_daily(panel, ticker_col, date_col, report_key)
+
+    compact.reports = compute_growth(compact.reports, factors, compact.ticker_col,
+                                     compact.report_key, periods_per_year)
+    if compact is panel:
+        return compact
+
+    out = panel.copy()
+    for name in factors:
+        out[name] = compact.column(name)
+    return out
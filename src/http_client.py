@@ -0,0 +1,124 @@
+"""
+Cliente HTTP Compartido (pool de conexiones, timeouts y reintentos)
+Una sola requests.Session para todas las llamadas del collector
+
+- Keep-alive: las conexiones TLS se reutilizan entre llamadas y threads
+  (pool_size conexiones por host)
+- Timeout de conexión y de lectura en cada petición: una respuesta lenta ya
+  no frena toda la corrida
+- Reintentos con backoff exponencial (más jitter) ante errores de red, 429 y
+  5xx; se respeta Retry-After si el servidor lo manda
+- retry_if: reintentos por contenido (p.ej. los "Note"/"Information" de
+  Alpha Vantage, que llegan con status 200)
+"""
+
+import random
+import threading
+from time import sleep
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class HttpRetryError(requests.RequestException):
+    """Se agotaron los reintentos (último error de red, status o motivo de retry_if)"""
+
+
+class HttpClient:
+    """
+    Ejemplo:
+        client = HttpClient(timeout=(5, 30), max_retries=4)
+        response = client.get(url, params={'symbol': 'AAPL'})
+
+    transport reemplaza a session.get (p.ej. SyntheticSource.get en benchmarks).
+    """
+
+    def __init__(self, pool_size=16, timeout=(5, 30), max_retries=4, backoff_base=1.0,
+                 backoff_max=60.0, transport=None, metrics=None, name='http'):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.metrics = metrics
+        self.name = name
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.transport = transport or self.session.get
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0}
+        self._lock = threading.Lock()
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+        if self.metrics is not None:
+            self.metrics.increment(f"{self.name}_{key}")
+
+    def backoff(self, attempt, retry_after=None, base=None):
+        """Espera antes del reintento attempt (0, 1, 2...)"""
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        base = self.backoff_base if base is None else base
+        delay = min(base * 2 ** attempt, self.backoff_max)
+        return delay + random.uniform(0, delay * 0.1)
+
+    @staticmethod
+    def _retry_after(response):
+        try:
+            return float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return None
+
+    def get(self, url, params=None, retry_if=None, backoff_base=None, before_attempt=None):
+        """
+        GET con reintentos.
+
+        Args:
+            retry_if: función response -> motivo (str) si hay que reintentar
+                aunque el status sea 200; None si la respuesta sirve
+            backoff_base: backoff_base propio de esta llamada (p.ej. más
+                largo para límites por minuto)
+            before_attempt: función sin argumentos que se llama antes de cada
+                intento, reintentos incluidos (p.ej. RateLimiter.acquire);
+                si devuelve False no se envía la petición
+
+        Returns:
+            requests.Response (status < 500 y sin motivo de retry_if), o None
+            si before_attempt negó un intento
+
+        Raises:
+            HttpRetryError si se agotaron los reintentos
+        """
+        reason = retry_after = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count('retries')
+                sleep(self.backoff(attempt - 1, retry_after, backoff_base))
+
+            if before_attempt is not None and not before_attempt():
+                return None
+            self._count('requests')
+            retry_after = None
+            try:
+                response = self.transport(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                reason = f"{type(e).__name__}: {e}"
+                continue
+
+            if response.status_code in RETRY_STATUS:
+                reason = f"HTTP {response.status_code}"
+                retry_after = self._retry_after(response)
+                continue
+            reason = retry_if(response) if retry_if is not None else None
+            if reason:
+                continue
+            return response
+
+        self._count('failures')
+        raise HttpRetryError(f"{url}: {self.max_retries + 1} intentos fallidos ({reason})")
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,193 @@
+"""
+Instrumentación de Corridas (tiempos, bytes, peticiones HTTP, filas, cache)
+Reemplaza el seguimiento por prints con métricas estructuradas
+
+- RunMetrics: acumulador thread-safe por etapa (llamadas, segundos, filas,
+  errores), peticiones y bytes por fuente, errores con contexto
+- instrumented(stage): decorador para métodos get_* (usa self.metrics)
+- report() / write_report(path): reporte de la corrida en JSON o Parquet
+"""
+
+import functools
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from time import perf_counter
+
+import pandas as pd
+
+
+def count_rows(value):
+    """Filas de un resultado (DataFrame, dict de DataFrames, lista...); 0 si no aplica"""
+    if value is None:
+        return 0
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(count_rows(v) for v in value.values() if isinstance(v, (pd.DataFrame, pd.Series)))
+    return 0
+
+
+def payload_bytes(value):
+    """
+    Tamaño aproximado de una respuesta ya decodificada (yfinance no expone los
+    bytes crudos): memoria de los DataFrames o largo del JSON.
+    """
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+class RunMetrics:
+    """
+    Métricas de una corrida.
+
+    Ejemplo:
+        metrics = RunMetrics()
+        with metrics.stage('pit', rows=len(panel)):
+            ...
+        metrics.count_http('alpha_vantage', 'BALANCE_SHEET', nbytes=len(resp.content))
+        metrics.write_report('../data/runs/run.json')
+    """
+
+    def __init__(self, name='run'):
+        self.name = name
+        self.started = datetime.now()
+        self.stages = {}
+        self.http = {}
+        self.bytes = {}
+        self.counters = {}
+        self.errors = []
+        self._lock = threading.Lock()
+
+    # ===== REGISTRO =====
+
+    def add_stage(self, name, seconds, rows=0, calls=1, errors=0):
+        with self._lock:
+            entry = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0, 'rows': 0, 'errors': 0})
+            entry['calls'] += calls
+            entry['seconds'] += seconds
+            entry['rows'] += rows
+            entry['errors'] += errors
+
+    @contextmanager
+    def stage(self, name, rows=0):
+        """
+        Mide una etapa. El dict que entrega permite fijar las filas al final:
+            with metrics.stage('read') as s:
+                df = ...
+                s['rows'] = len(df)
+        """
+        info = {'rows': rows}
+        t0 = perf_counter()
+        try:
+            yield info
+        except Exception:
+            self.add_stage(name, perf_counter() - t0, info['rows'], errors=1)
+            raise
+        self.add_stage(name, perf_counter() - t0, info['rows'])
+
+    def count_http(self, source, endpoint, nbytes=0):
+        with self._lock:
+            calls = self.http.setdefault(source, {})
+            calls[endpoint] = calls.get(endpoint, 0) + 1
+            self.bytes[source] = self.bytes.get(source, 0) + int(nbytes)
+
+    def increment(self, counter, n=1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + n
+
+    def record_error(self, ticker, source, error, **extra):
+        entry = {'ticker': ticker, 'source': source, 'error': str(error),
+                 'time': datetime.now().isoformat(timespec='seconds'), **extra}
+        with self._lock:
+            self.errors.append(entry)
+        return entry
+
+    def merge(self, report):
+        """Suma el report() de otra corrida (p.ej. de un worker en otro proceso)"""
+        for name, entry in report.get('stages', {}).items():
+            self.add_stage(name, entry['seconds'], entry['rows'], entry['calls'], entry['errors'])
+        for source, calls in report.get('http_calls', {}).items():
+            for endpoint, n in calls.items():
+                with self._lock:
+                    bucket = self.http.setdefault(source, {})
+                    bucket[endpoint] = bucket.get(endpoint, 0) + n
+        for source, n in report.get('bytes', {}).items():
+            with self._lock:
+                self.bytes[source] = self.bytes.get(source, 0) + n
+        for counter, n in report.get('counters', {}).items():
+            self.increment(counter, n)
+        with self._lock:
+            self.errors.extend(report.get('errors', []))
+
+    # ===== REPORTE =====
+
+    def report(self, cache_stats=None, extra=None):
+        """Reporte de la corrida como dict serializable"""
+        with self._lock:
+            report = {
+                'name': self.name,
+                'started': self.started.isoformat(timespec='seconds'),
+                'elapsed_seconds': (datetime.now() - self.started).total_seconds(),
+                'stages': {k: dict(v) for k, v in self.stages.items()},
+                'http_calls': {k: dict(v) for k, v in self.http.items()},
+                'http_totals': {k: sum(v.values()) for k, v in self.http.items()},
+                'bytes': dict(self.bytes),
+                'counters': dict(self.counters),
+                'errors': list(self.errors),
+            }
+        if cache_stats is not None:
+            report['cache'] = dict(cache_stats)
+        if extra:
+            report.update(extra)
+        return report
+
+    def write_report(self, path, cache_stats=None, extra=None):
+        """
+        Guarda el reporte: .json completo, o .parquet con una fila por etapa
+        (los errores van a un archivo hermano *_errors.parquet).
+        """
+        report = self.report(cache_stats, extra)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if path.endswith('.parquet'):
+            stages = pd.DataFrame([{'stage': name, **entry} for name, entry in report['stages'].items()])
+            stages.assign(run=report['name'], started=report['started']).to_parquet(path, index=False)
+            if report['errors']:
+                pd.DataFrame(report['errors']).to_parquet(
+                    path.replace('.parquet', '_errors.parquet'), index=False)
+        else:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2, default=str)
+        return path
+
+
+def instrumented(stage):
+    """
+    Decorador para métodos de clases con atributo metrics (RunMetrics):
+    registra tiempo, llamadas y filas del resultado bajo `stage`.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            metrics = getattr(self, 'metrics', None)
+            if metrics is None:
+                return method(self, *args, **kwargs)
+            with metrics.stage(stage) as info:
+                result = method(self, *args, **kwargs)
+                info['rows'] = count_rows(result)
+            return result
+        return wrapper
+    return decorator
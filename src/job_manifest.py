@@ -0,0 +1,193 @@
+"""
+Manifiesto de Trabajos de Recolección (reanudables)
+Estado por ticker y por fuente, persistido en disco para retomar tras un corte
+
+Un universo de miles de tickers no termina en un día con la cuota de Alpha
+Vantage. El manifiesto registra qué quedó hecho en cada fuente:
+- 'done': no se vuelve a pedir
+- 'failed': se reintenta con backoff exponencial (next_attempt)
+- 'deferred': esperando cuota (Alpha Vantage); no cuenta como intento fallido
+- 'exhausted': agotó max_attempts; se omite hasta que se reinicie a mano
+
+El archivo es un log JSONL (una línea por cambio de estado, la última gana):
+escribir un cambio es un append barato y un corte a mitad de línea solo
+pierde esa línea. Al abrirlo se compacta a una línea por (ticker, fuente).
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from time import time
+
+SOURCES = ('yahoo', 'alpha_vantage')
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+DEFERRED = 'deferred'
+EXHAUSTED = 'exhausted'
+
+
+class JobManifest:
+    """
+    Estado persistente de un trabajo de recolección.
+
+    Ejemplo:
+        manifest = JobManifest("../data/jobs/universo.jsonl", params={'start': '2016-01-01'})
+        manifest.add(tickers)
+        for ticker in manifest.due('yahoo'):
+            ...
+            manifest.mark_done(ticker, 'yahoo')
+    """
+
+    def __init__(self, path, params=None, sources=SOURCES, max_attempts=5,
+                 backoff_base=60, backoff_max=6 * 60 * 60):
+        self.path = path
+        self.params = params or {}
+        self.sources = tuple(sources)
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.entries = {}  # (ticker, fuente) -> estado
+        self.order = []    # Tickers en el orden en que se agregaron
+        self._known = set()
+        self._lock = threading.Lock()
+        self._load()
+
+    # ===== PERSISTENCIA =====
+
+    def _load(self):
+        """Reproduce el log, valida los parámetros del trabajo y lo compacta"""
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Línea cortada por una caída a mitad de escritura
+                    if 'job' in record:
+                        stored = record['job']
+                        if self.params and stored and stored != self.params:
+                            raise ValueError(
+                                f"El manifiesto {self.path} es de otro trabajo ({stored}); "
+                                f"usar otro path para {self.params}")
+                        self.params = self.params or stored
+                        continue
+                    key = (record.pop('ticker'), record.pop('source'))
+                    if key[0] not in self._known:
+                        self._known.add(key[0])
+                        self.order.append(key[0])
+                    self.entries[key] = record
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(json.dumps({'job': self.params}) + '\n')
+            for (ticker, source), entry in self.entries.items():
+                f.write(json.dumps({'ticker': ticker, 'source': source, **entry}, default=str) + '\n')
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, 'a')
+
+    def _write(self, ticker, source, entry):
+        """Actualiza un estado y lo agrega al log (se llama con el lock tomado)"""
+        entry['updated'] = datetime.now().isoformat(timespec='seconds')
+        self.entries[(ticker, source)] = entry
+        self._file.write(json.dumps({'ticker': ticker, 'source': source, **entry}, default=str) + '\n')
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ===== ESTADO =====
+
+    def add(self, tickers):
+        """Registra tickers nuevos como pendientes en todas las fuentes"""
+        with self._lock:
+            for ticker in dict.fromkeys(tickers):
+                if ticker in self._known:
+                    continue
+                self._known.add(ticker)
+                self.order.append(ticker)
+                for source in self.sources:
+                    self._write(ticker, source, {'status': PENDING, 'attempts': 0,
+                                                 'next_attempt': 0.0})
+
+    def get(self, ticker, source):
+        return dict(self.entries.get((ticker, source), {'status': PENDING, 'attempts': 0,
+                                                        'next_attempt': 0.0}))
+
+    def status(self, ticker, source):
+        return self.get(ticker, source)['status']
+
+    def is_due(self, ticker, source, now=None):
+        """True si (ticker, fuente) falta y ya pasó su backoff / espera de cuota"""
+        entry = self.get(ticker, source)
+        if entry['status'] in (DONE, EXHAUSTED):
+            return False
+        return entry['next_attempt'] <= (time() if now is None else now)
+
+    def due(self, source, tickers=None, now=None):
+        """Tickers pendientes de source que se pueden intentar ahora"""
+        now = time() if now is None else now
+        return [t for t in (self.order if tickers is None else tickers) if self.is_due(t, source, now)]
+
+    def next_due(self, tickers=None, sources=None):
+        """Momento (epoch) del próximo intento programado; None si no queda nada"""
+        times = [self.entries[(t, s)]['next_attempt']
+                 for t in (self.order if tickers is None else tickers) for s in (sources or self.sources)
+                 if (t, s) in self.entries and self.entries[(t, s)]['status'] not in (DONE, EXHAUSTED)]
+        return min(times) if times else None
+
+    def mark_done(self, ticker, source, **detail):
+        with self._lock:
+            attempts = self.get(ticker, source)['attempts'] + 1
+            self._write(ticker, source, {'status': DONE, 'attempts': attempts,
+                                         'next_attempt': 0.0, **detail})
+
+    def mark_failed(self, ticker, source, error):
+        """Intento fallido: backoff exponencial, o 'exhausted' tras max_attempts"""
+        with self._lock:
+            attempts = self.get(ticker, source)['attempts'] + 1
+            delay = min(self.backoff_base * 2 ** (attempts - 1), self.backoff_max)
+            status = EXHAUSTED if attempts >= self.max_attempts else FAILED
+            self._write(ticker, source, {'status': status, 'attempts': attempts,
+                                         'next_attempt': time() + delay, 'error': str(error)})
+
+    def mark_deferred(self, ticker, source, until, reason=''):
+        """Sin cuota: se retoma en until (epoch) sin gastar un intento"""
+        with self._lock:
+            attempts = self.get(ticker, source)['attempts']
+            self._write(ticker, source, {'status': DEFERRED, 'attempts': attempts,
+                                         'next_attempt': float(until), 'error': reason})
+
+    def release_deferred(self, source):
+        """La cuota volvió antes de lo previsto: lo diferido queda disponible ya"""
+        with self._lock:
+            for (ticker, src), entry in list(self.entries.items()):
+                if entry['status'] == DEFERRED and src == source and entry['next_attempt'] > time():
+                    self._write(ticker, src, {**entry, 'next_attempt': time()})
+
+    def retry_exhausted(self, source=None):
+        """Vuelve a pendiente lo que agotó sus intentos (p.ej. tras arreglar un bug)"""
+        with self._lock:
+            for (ticker, src), entry in list(self.entries.items()):
+                if entry['status'] == EXHAUSTED and source in (None, src):
+                    self._write(ticker, src, {'status': PENDING, 'attempts': 0, 'next_attempt': 0.0})
+
+    def summary(self, tickers=None):
+        """dict fuente -> {estado: cantidad}"""
+        out = {source: {} for source in self.sources}
+        for ticker in (self.order if tickers is None else tickers):
+            for source in self.sources:
+                status = self.status(ticker, source)
+                out[source][status] = out[source].get(status, 0) + 1
+        return out
@@ -0,0 +1,293 @@
+"""
+Características de Bajo Riesgo (beta, volatilidad, ivol, rmax)
+Kernels móviles sobre la matriz completa de retornos (fechas x tickers)
+
+- Momentos móviles con sumas acumuladas: O(1) por paso, todos los tickers a la vez
+- Regresiones móviles (CAPM, FF3) armando X'X y X'y con las mismas sumas
+  acumuladas y resolviendo todos los sistemas en lote con np.linalg.solve
+- Sin regresiones por ticker en un loop de Python
+"""
+
+import numpy as np
+import pandas as pd
+from time import perf_counter
+
+# característica -> (ventana, mínimo de observaciones)
+LOW_RISK_WINDOWS = {
+    'rvol_21d': (21, 15),
+    'rvol_252d': (252, 120),
+    'ivol_capm_21d': (21, 15),
+    'ivol_ff3_21d': (21, 15),
+    'rmax1_21d': (21, 15),
+    'rmax5_21d': (21, 15),
+    'beta_60m': (60, 36),  # Meses
+}
+
+
+# ===== PREPARACIÓN =====
+
+def returns_matrix(panel, ticker_col='ticker', date_col='date_market', price_col='Close'):
+    """Panel largo de precios -> matriz de retornos diarios (fechas x tickers)"""
+    prices = panel.pivot_table(index=date_col, columns=ticker_col, values=price_col, aggfunc='last')
+    return prices.sort_index().pct_change(fill_method=None)
+
+
+def monthly_returns(returns):
+    """Retornos diarios -> mensuales compuestos (fin de mes); meses sin datos quedan NaN"""
+    log_ret = np.log1p(returns)
+    months = returns.index.to_period('M')
+    total = log_ret.groupby(months).sum(min_count=1)
+    monthly = np.expm1(total)
+    monthly.index = monthly.index.to_timestamp(how='end').normalize()
+    return monthly
+
+
+# ===== KERNELS =====
+
+def _rolling_sum(x, window):
+    """Suma móvil por columna con sumas acumuladas (x sin NaN)"""
+    cs = np.cumsum(x, axis=0)
+    out = cs.copy()
+    out[window:] = cs[window:] - cs[:-window]
+    return out
+
+
+def rolling_moments(values, window, min_periods):
+    """
+    Media y desviación estándar móviles (muestrales) de cada columna.
+    Los NaN no cuentan como observación.
+    """
+    valid = np.isfinite(values)
+    x = np.where(valid, values, 0.0)
+    n = _rolling_sum(valid.astype(float), window)
+    s1 = _rolling_sum(x, window)
+    s2 = _rolling_sum(x * x, window)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = s1 / n
+        var = (s2 - s1 * mean) / (n - 1)
+    var = np.maximum(var, 0.0)  # Errores de redondeo
+    ok = n >= max(min_periods, 2)
+    return np.where(ok, mean, np.nan), np.where(ok, np.sqrt(var), np.nan)
+
+
+def _regression_block(y, design, window, min_periods, rows):
+    """rolling_regression para un bloque de columnas de y (design ya incluye el intercepto)"""
+    p = design.shape[1]
+    mask = (np.isfinite(y) & np.isfinite(design).all(axis=1)[:, None]).astype(float)
+    design = np.nan_to_num(design)
+    y0 = np.where(mask > 0, y, 0.0)
+
+    xtx = np.empty((len(rows), y.shape[1], p, p))
+    for a in range(p):
+        for b in range(a, p):
+            s = _rolling_sum(mask * (design[:, a] * design[:, b])[:, None], window)[rows]
+            xtx[..., a, b] = s
+            xtx[..., b, a] = s
+    xty = np.stack([_rolling_sum(mask * design[:, a][:, None] * y0, window)[rows]
+                    for a in range(p)], axis=-1)
+    yy = _rolling_sum(mask * y0 * y0, window)[rows]
+    n = xtx[..., 0, 0]
+
+    coefs = np.full(xty.shape, np.nan)
+    resid_std = np.full(n.shape, np.nan)
+
+    ok = n >= max(min_periods, p + 1)
+    if ok.any():
+        # Sistemas singulares (p.ej. regresor constante en la ventana) quedan en NaN
+        # (det de X'X normalizada por su diagonal: 1 = ortogonal, 0 = singular)
+        sub = xtx[ok]
+        diag = np.sqrt(np.einsum('...ii->...i', sub))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            det = np.linalg.det(sub / (diag[..., :, None] * diag[..., None, :]))
+        solvable = np.nan_to_num(det) > 1e-10
+        idx = tuple(i[solvable] for i in np.nonzero(ok))
+        ok[:] = False
+        ok[idx] = True
+
+    if ok.any():
+        b = np.linalg.solve(xtx[ok], xty[ok][..., None])[..., 0]
+        sse = yy[ok] - np.einsum('ij,ij->i', b, xty[ok])
+        coefs[ok] = b
+        resid_std[ok] = np.sqrt(np.maximum(sse, 0.0) / (n[ok] - p))
+
+    return coefs, resid_std
+
+
+def rolling_regression(y, x, window, min_periods, rows=None, block_size=2 ** 22):
+    """
+    Regresión móvil de cada columna de y (T x N) contra los regresores
+    comunes x (T x k) más intercepto.
+
+    X'X y X'y se construyen por ticker con sumas móviles (cada ticker usa solo
+    las fechas donde él y los regresores tienen datos) y los sistemas se
+    resuelven en lote, por bloques de columnas: X'X de un bloque (filas x
+    columnas x p x p) no pasa de block_size elementos.
+
+    Args:
+        rows: índices de fila donde evaluar (p.ej. solo fines de mes);
+            por defecto todas las filas
+
+    Returns:
+        (coeficientes T' x N x (k+1), desviación residual T' x N)
+    """
+    y = np.asarray(y, dtype=float)
+    x = np.asarray(x, dtype=float).reshape(len(y), -1)
+    design = np.column_stack([np.ones(len(x)), x])
+    p = design.shape[1]
+    rows = np.arange(len(y)) if rows is None else np.asarray(rows)
+
+    coefs = np.empty((len(rows), y.shape[1], p))
+    resid_std = np.empty((len(rows), y.shape[1]))
+    step = max(1, block_size // (len(rows) * p * p or 1))
+    for start in range(0, y.shape[1], step):
+        cols = slice(start, start + step)
+        coefs[:, cols], resid_std[:, cols] = _regression_block(y[:, cols], design, window,
+                                                               min_periods, rows)
+    return coefs, resid_std
+
+
+def rolling_max(values, window, min_periods):
+    """Máximo móvil de todas las columnas (pandas, algoritmo de ventana O(1) amortizado)"""
+    return pd.DataFrame(values).rolling(window, min_periods=min_periods).max().to_numpy()
+
+
+def rolling_top_mean(values, window, min_periods, top=5, block_size=2 ** 22):
+    """
+    Promedio de los `top` valores más altos de cada ventana.
+
+    np.partition copia las ventanas (filas x columnas x window), así que se
+    procesa por bloques de columnas de a lo sumo block_size elementos.
+    """
+    values = np.asarray(values, dtype=float)
+    valid = np.isfinite(values)
+    count = _rolling_sum(valid.astype(float), window)
+    mean = np.empty(values.shape)
+
+    # Relleno al inicio para que las primeras filas tengan ventanas parciales
+    filled = np.full((len(values) + window - 1,) + values.shape[1:], -np.inf)
+    filled[window - 1:] = np.where(valid, values, -np.inf)
+    if values.ndim == 1:
+        filled, mean = filled[:, None], mean[:, None]
+    step = max(1, block_size // (len(values) * window or 1))
+    for start in range(0, filled.shape[1], step):
+        windows = np.lib.stride_tricks.sliding_window_view(filled[:, start:start + step], window, axis=0)
+        best = np.partition(windows, window - top, axis=-1)[..., window - top:]
+        with np.errstate(invalid='ignore'):
+            mean[:, start:start + step] = best.mean(axis=-1)
+    return np.where(count >= max(min_periods, top), mean.reshape(values.shape), np.nan)
+
+
+# ===== CARACTERÍSTICAS =====
+
+def compute_low_risk(returns, market=None, ff_factors=None, characteristics=None):
+    """
+    Calcula las características de bajo riesgo de LOW_RISK_WINDOWS.
+
+    Args:
+        returns: DataFrame de retornos diarios (fechas x tickers)
+        market: retorno diario del mercado; por defecto el promedio
+            equiponderado del universo (aproximación)
+        ff_factors: DataFrame diario con columnas [mkt, smb, hml] para
+            ivol_ff3_21d (si falta, esa característica se omite)
+        characteristics: subconjunto de LOW_RISK_WINDOWS
+
+    Returns:
+        dict característica -> DataFrame (fechas x tickers); beta_60m en
+        frecuencia mensual
+    """
+    characteristics = list(characteristics or LOW_RISK_WINDOWS)
+    values = returns.to_numpy(dtype=float)
+    if market is None:
+        market = returns.mean(axis=1)
+    market = pd.Series(market).reindex(returns.index).to_numpy(dtype=float)
+
+    def frame(array, index=returns.index):
+        return pd.DataFrame(array, index=index, columns=returns.columns)
+
+    out = {}
+    for name in characteristics:
+        window, min_periods = LOW_RISK_WINDOWS[name]
+
+        if name.startswith('rvol_'):
+            out[name] = frame(rolling_moments(values, window, min_periods)[1])
+        elif name == 'ivol_capm_21d':
+            out[name] = frame(rolling_regression(values, market, window, min_periods)[1])
+        elif name == 'ivol_ff3_21d':
+            if ff_factors is None:
+                print('⚠️  ivol_ff3_21d omitido: faltan factores Fama-French (mkt, smb, hml)')
+                continue
+            ff = ff_factors.reindex(returns.index).to_numpy(dtype=float)
+            out[name] = frame(rolling_regression(values, ff, window, min_periods)[1])
+        elif name == 'rmax1_21d':
+            out[name] = frame(rolling_max(values, window, min_periods))
+        elif name == 'rmax5_21d':
+            out[name] = frame(rolling_top_mean(values, window, min_periods, top=5))
+        elif name == 'beta_60m':
+            monthly = monthly_returns(returns)
+            market_monthly = monthly_returns(pd.DataFrame({'mkt': market}, index=returns.index))['mkt']
+            coefs, _ = rolling_regression(monthly.to_numpy(), market_monthly.to_numpy(),
+                                          window, min_periods)
+            out[name] = frame(coefs[..., 1], index=monthly.index)
+
+    return out
+
+
+# ===== BENCHMARK =====
+
+def _naive_low_risk(returns, market):
+    """Referencia: rolling().apply por ticker (lo que se haría sin kernels)"""
+    out = {'rvol_21d': {}, 'ivol_capm_21d': {}, 'rmax5_21d': {}}
+    for ticker in returns.columns:
+        r = returns[ticker]
+        out['rvol_21d'][ticker] = r.rolling(21, min_periods=15).apply(np.nanstd, kwargs={'ddof': 1}, raw=True)
+        out['rmax5_21d'][ticker] = r.rolling(21, min_periods=15).apply(
+            lambda w: np.sort(w[np.isfinite(w)])[-5:].mean(), raw=True)
+
+        def ivol(idx):
+            idx = idx.astype(int)
+            y, x = r.to_numpy()[idx], market[idx]
+            ok = np.isfinite(y) & np.isfinite(x)
+            if ok.sum() < 15:
+                return np.nan
+            X = np.column_stack([np.ones(ok.sum()), x[ok]])
+            b, *_ = np.linalg.lstsq(X, y[ok], rcond=None)
+            resid = y[ok] - X @ b
+            return np.sqrt(resid @ resid / (ok.sum() - 2))
+
+        positions = pd.Series(np.arange(len(r)), dtype=float)
+        out['ivol_capm_21d'][ticker] = positions.rolling(21, min_periods=1).apply(ivol, raw=True).to_numpy()
+    return {k: pd.DataFrame(v, index=returns.index) for k, v in out.items()}
+
+
+def benchmark(n_tickers=100, n_days=756, seed=0):
+    """Compara los kernels contra rolling().apply por ticker (tiempo y resultado)"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2016-01-01', periods=n_days)
+    market = pd.Series(rng.normal(0.0004, 0.01, n_days), index=dates)
+    betas = rng.uniform(0.5, 1.5, n_tickers)
+    returns = pd.DataFrame(market.to_numpy()[:, None] * betas
+                           + rng.normal(0, 0.015, (n_days, n_tickers)),
+                           index=dates, columns=[f'T{i:04d}' for i in range(n_tickers)])
+    returns.iloc[:10, :5] = np.nan  # Historias que empiezan tarde
+
+    names = ['rvol_21d', 'ivol_capm_21d', 'rmax5_21d']
+    t0 = perf_counter()
+    fast = compute_low_risk(returns, market, characteristics=names)
+    t_fast = perf_counter() - t0
+
+    t0 = perf_counter()
+    slow = _naive_low_risk(returns, market.to_numpy())
+    t_slow = perf_counter() - t0
+
+    print(f'🧪 Bajo riesgo: {n_tickers} tickers x {n_days} días')
+    print(f'   Kernels vectorizados: {t_fast:7.2f}s')
+    print(f'   rolling().apply:      {t_slow:7.2f}s  ({t_slow / t_fast:.0f}x más lento)')
+    for name in names:
+        same = np.allclose(fast[name], slow[name], equal_nan=True, atol=1e-10)
+        print(f'   {name:15s} coincide: {"✅" if same else "❌"}')
+    return {'vectorized': t_fast, 'naive': t_slow}
+
+
+if __name__ == '__main__':
+    benchmark()
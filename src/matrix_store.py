@@ -0,0 +1,166 @@
+"""
+Matriz Densa de Precios y Retornos en Disco (memory-mapped)
+fechas x tickers en float32, con un índice de tickers/fechas al lado
+
+Los cálculos de riesgo y momentum trabajan sobre la matriz completa, pero
+cada uno volvía a leer el Close de cada CSV y a hacer pct_change. Aquí la
+matriz se arma una vez y después se abre con np.memmap:
+- Un rango de fechas (todas las columnas) o un bloque contiguo de tickers es
+  una vista sin copia; el sistema operativo carga solo las páginas tocadas
+- Varios procesos que abren el mismo archivo comparten la page cache: cada
+  worker recibe solo la ruta (el objeto se serializa sin los datos)
+
+Archivos en root:
+    prices.f32 / returns.f32   float32 en orden C (fila = fecha)
+    index.json                 tickers, fechas, forma y columna de precio
+
+Ejemplo:
+    store = MatrixStore.from_storage(get_storage('parquet'), "../data/matrix")
+    low_risk = compute_low_risk(store.frame('returns', start='2020-01-01'))
+    momentum = compute_momentum(store.frame('prices'))
+"""
+
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+KINDS = ('prices', 'returns')
+DTYPE = np.float32
+
+
+class MatrixStore:
+    """
+    Matrices de precios y retornos diarios abiertas en modo lectura.
+
+    Ojo: los kernels que acumulan (sumas móviles, regresiones) deben pasar a
+    float64 (p.ej. to_numpy(dtype=float)); float32 es solo el formato en disco.
+    """
+
+    def __init__(self, root="../data/matrix"):
+        self.root = root
+        with open(self._path('index.json')) as f:
+            meta = json.load(f)
+        self.meta = meta
+        self.tickers = meta['tickers']
+        self.dates = pd.DatetimeIndex(pd.to_datetime(meta['dates']), name='date_market')
+        self.shape = (len(self.dates), len(self.tickers))
+        self._positions = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self._arrays = {}
+
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    # Entre procesos viaja solo la ruta; cada worker abre su propio memmap
+    def __getstate__(self):
+        return {'root': self.root}
+
+    def __setstate__(self, state):
+        self.__init__(state['root'])
+
+    # ===== CONSTRUCCIÓN =====
+
+    @classmethod
+    def build(cls, prices, root="../data/matrix", price_col='Close'):
+        """
+        Escribe la matriz de precios (DataFrame fechas x tickers) y sus retornos.
+
+        Cada archivo se escribe aparte y se renombra; index.json va al final.
+        Quien ya tenía abierta la versión anterior sigue leyéndola sin errores.
+        """
+        os.makedirs(root, exist_ok=True)
+        prices = prices.sort_index()
+        returns = prices.astype(float).pct_change(fill_method=None)
+
+        for kind, frame in (('prices', prices), ('returns', returns)):
+            path = os.path.join(root, f"{kind}.f32")
+            array = np.memmap(f"{path}.tmp", dtype=DTYPE, mode='w+', shape=frame.shape)
+            array[:] = frame.to_numpy(dtype=DTYPE)
+            array.flush()
+            del array
+            os.replace(f"{path}.tmp", path)
+
+        meta = {
+            'version': 1,
+            'dtype': np.dtype(DTYPE).name,
+            'price_col': price_col,
+            'tickers': [str(t) for t in prices.columns],
+            'dates': [d.strftime('%Y-%m-%d') for d in pd.DatetimeIndex(prices.index)],
+            'built': datetime.now().isoformat(timespec='seconds'),
+        }
+        index_path = os.path.join(root, 'index.json')
+        with open(f"{index_path}.tmp", 'w') as f:
+            json.dump(meta, f)
+        os.replace(f"{index_path}.tmp", index_path)
+        return cls(root)
+
+    @classmethod
+    def from_storage(cls, storage, root="../data/matrix", tickers=None, price_col='Close',
+                     chunk_size=500):
+        """Arma la matriz leyendo price_col de storage por bloques de tickers"""
+        tickers = list(tickers or storage.tickers('market'))
+        frames = []
+        for i in range(0, len(tickers), chunk_size):
+            chunk = storage.read('market', tickers[i:i + chunk_size], columns=[price_col])
+            if chunk.empty:
+                continue
+            # Día calendario sin zona horaria (los CSV de Yahoo traen -05:00/-04:00)
+            chunk['date'] = pd.to_datetime(chunk['Date'].astype(str).str[:10])
+            frames.append(chunk.pivot_table(index='date', columns='ticker', values=price_col,
+                                            aggfunc='last'))
+        prices = pd.concat(frames, axis=1) if frames else pd.DataFrame()
+        prices.columns.name = None
+        return cls.build(prices[[t for t in tickers if t in prices.columns]], root, price_col)
+
+    # ===== LECTURA =====
+
+    def array(self, kind):
+        """np.memmap de solo lectura (fechas x tickers)"""
+        if kind not in KINDS:
+            raise ValueError(f"Tipo de matriz desconocido: {kind} (usar {', '.join(KINDS)})")
+        if kind not in self._arrays:
+            path = self._path(f"{kind}.f32")
+            expected = self.shape[0] * self.shape[1] * np.dtype(DTYPE).itemsize
+            if os.path.getsize(path) != expected:
+                raise ValueError(f"{path} no coincide con index.json {self.shape}; reconstruir la matriz")
+            self._arrays[kind] = np.memmap(path, dtype=DTYPE, mode='r', shape=self.shape)
+        return self._arrays[kind]
+
+    def columns(self, tickers):
+        """
+        Selector de columnas: un slice si los tickers son contiguos y en orden
+        (vista sin copia); si no, un array de posiciones (copia solo esas columnas).
+        """
+        missing = [t for t in tickers if t not in self._positions]
+        if missing:
+            raise KeyError(f"Tickers fuera de la matriz: {', '.join(missing[:5])}")
+        positions = np.array([self._positions[t] for t in tickers], dtype=np.intp)
+        if len(positions) and np.all(np.diff(positions) == 1):
+            return slice(int(positions[0]), int(positions[-1]) + 1)
+        return positions
+
+    def rows(self, start=None, end=None):
+        """Slice de fechas [start, end] (ambos inclusive)"""
+        first = 0 if start is None else self.dates.searchsorted(pd.Timestamp(start), 'left')
+        last = len(self.dates) if end is None else self.dates.searchsorted(pd.Timestamp(end), 'right')
+        return slice(int(first), int(last))
+
+    def values(self, kind, tickers=None, start=None, end=None):
+        """Sub-matriz como ndarray (vista del memmap cuando se puede)"""
+        rows = self.rows(start, end)
+        cols = slice(None) if tickers is None else self.columns(tickers)
+        return self.array(kind)[rows, cols]
+
+    def frame(self, kind, tickers=None, start=None, end=None):
+        """Sub-matriz como DataFrame fechas x tickers, sin copiar la vista"""
+        rows = self.rows(start, end)
+        cols = slice(None) if tickers is None else self.columns(tickers)
+        names = self.tickers[cols] if isinstance(cols, slice) else [self.tickers[i] for i in cols]
+        return pd.DataFrame(self.array(kind)[rows, cols], index=self.dates[rows],
+                            columns=names, copy=False)
+
+    def series(self, kind, ticker, start=None, end=None):
+        """Una columna (vista con stride del memmap)"""
+        return self.frame(kind, [ticker], start, end)[ticker]
@@ -0,0 +1,121 @@
+"""
+Momentum y Reversión (ret_1_0 ... ret_60_12)
+Una sola pasada: precios fin de mes -> log-precios desfasados -> todas las ventanas
+
+El notebook 03 calcula ret_1m y ret_12m con pct_change sobre filas diarias.
+Aquí se remuestrea a fin de mes una vez y cada ret_a_b (retorno de t-a a t-b)
+sale como diferencia de los log-precios desfasados b y a, para todas las
+ventanas y todos los tickers en una sola operación. El conteo acumulado de
+meses con retorno solo decide si la ventana tiene historia suficiente.
+"""
+
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.diccionario_variables import CARACTERISTICAS_DISPONIBLES
+
+MOMENTUM_WINDOWS = {
+    name: tuple(int(x) for x in match.groups())
+    for name in CARACTERISTICAS_DISPONIBLES
+    if (match := re.fullmatch(r'ret_(\d+)_(\d+)', name))
+}
+
+# Fracción mínima de meses con retorno dentro de la ventana
+DEFAULT_MIN_RATIO = 0.5
+
+
+def month_end_prices(prices):
+    """Precios diarios (fechas x tickers) -> último precio válido de cada mes"""
+    monthly = prices.groupby(prices.index.to_period('M')).last()
+    monthly.index = monthly.index.to_timestamp(how='end').normalize()
+    return monthly
+
+
+def log_prices_and_counts(monthly_prices):
+    """
+    Log-precio de fin de mes y conteo acumulado de meses con retorno.
+
+    Un mes sin precio deja NaN en el log-precio; el conteo no lo suma (ni al
+    mes siguiente, que tampoco tiene retorno mes a mes).
+    """
+    values = monthly_prices.to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_prices = np.where(values > 0, np.log(values), np.nan)
+    valid = np.zeros(values.shape, dtype=bool)
+    valid[1:] = np.isfinite(log_prices[1:]) & np.isfinite(log_prices[:-1])
+    return log_prices, np.cumsum(valid, axis=0)
+
+
+def _shift(array, offsets, fill=np.nan):
+    """Apila array desplazado hacia abajo por cada offset (offsets x T x N)"""
+    out = np.full((len(offsets),) + array.shape, fill, dtype=float)
+    for i, offset in enumerate(offsets):
+        out[i, offset:] = array[:len(array) - offset] if offset else array
+    return out
+
+
+def compute_momentum(prices, windows=None, min_ratio=DEFAULT_MIN_RATIO):
+    """
+    Calcula ret_a_b = P(t-b) / P(t-a) - 1 con precios de fin de mes.
+
+    Args:
+        prices: DataFrame de precios diarios (fechas x tickers); ya debe estar
+            ajustado por splits/dividendos (Close de yfinance lo está)
+        windows: subconjunto de MOMENTUM_WINDOWS (nombres)
+        min_ratio: fracción mínima de meses con retorno entre t-a y t-b;
+            además debe haber precio de fin de mes en t-a y en t-b (el
+            retorno sale de esos dos precios aunque falten meses en medio)
+
+    Returns:
+        dict ret_a_b -> DataFrame mensual (fin de mes x tickers)
+    """
+    windows = list(windows or MOMENTUM_WINDOWS)
+    unknown = [w for w in windows if w not in MOMENTUM_WINDOWS]
+    if unknown:
+        raise ValueError(f"Ventanas desconocidas: {', '.join(unknown)}")
+
+    monthly = month_end_prices(prices)
+    log_prices, count = log_prices_and_counts(monthly)
+
+    starts = np.array([MOMENTUM_WINDOWS[w][0] for w in windows])
+    ends = np.array([MOMENTUM_WINDOWS[w][1] for w in windows])
+    offsets = np.unique(np.concatenate([starts, ends]))
+    position = {o: i for i, o in enumerate(offsets)}
+    log_lag = _shift(log_prices, offsets)
+    count_lag = _shift(count.astype(float), offsets)
+
+    # Todas las ventanas de una vez: (ventanas x meses x tickers)
+    a = np.array([position[o] for o in starts])
+    b = np.array([position[o] for o in ends])
+    log_window = log_lag[b] - log_lag[a]
+    obs = count_lag[b] - count_lag[a]
+    need = np.ceil(min_ratio * (starts - ends))[:, None, None]
+    ok = (obs >= need) & np.isfinite(log_window)
+    with np.errstate(invalid='ignore'):
+        result = np.where(ok, np.expm1(log_window), np.nan)
+
+    return {name: pd.DataFrame(result[i], index=monthly.index, columns=monthly.columns)
+            for i, name in enumerate(windows)}
+
+
+def momentum_panel(panel, ticker_col='ticker', date_col='date_market', price_col='Close',
+                   windows=None, min_ratio=DEFAULT_MIN_RATIO):
+    """
+    Versión para paneles largos (formato PIT): devuelve una fila por ticker y
+    fin de mes con una columna por ventana.
+    """
+    prices = panel.pivot_table(index=date_col, columns=ticker_col, values=price_col, aggfunc='last')
+    results = compute_momentum(prices.sort_index(), windows, min_ratio)
+
+    stacked = pd.concat({name: frame.stack(future_stack=True) for name, frame in results.items()},
+                        axis=1)
+    stacked.index.names = ['date_month', ticker_col]
+    out = stacked.reset_index()
+    out = out.dropna(subset=list(results), how='all')
+    return out[[ticker_col, 'date_month'] + list(results)].sort_values(
+        [ticker_col, 'date_month'], kind='stable').reset_index(drop=True)
@@ -0,0 +1,85 @@
+"""
+Normalización Cross-Sectional de Factores
+Winsorización, ranking y z-score por fecha (entre empresas), como en el paper
+
+El helper winsorize del notebook 03 recorta con cuantiles de la serie de
+tiempo de un solo ticker; aquí los cuantiles se calculan para cada fecha
+sobre todas las empresas, para todos los factores en una sola pasada.
+"""
+
+import numpy as np
+import pandas as pd
+
+METHODS = ('winsorize', 'rank', 'zscore')
+
+
+def _broadcast(stats, codes):
+    """Lleva estadísticos por fecha (n_fechas x n_factores) a cada fila"""
+    out = stats.reindex(range(codes.max() + 1)).to_numpy(dtype=float)[np.clip(codes, 0, None)]
+    out[codes < 0] = np.nan  # Filas sin fecha
+    return out
+
+
+def normalize_cross_section(panel, factors, date_col='date_market', methods=('winsorize',),
+                            lower=0.01, upper=0.99, min_obs=5, keep_raw=False, inplace=False):
+    """
+    Normaliza factores por sección cruzada (todas las empresas de cada fecha).
+
+    Args:
+        panel: panel largo (una fila por ticker y fecha)
+        factors: columnas a normalizar
+        methods: cualquier combinación de 'winsorize', 'rank', 'zscore'
+            - winsorize: recorta cada factor a sus cuantiles [lower, upper] de la
+              fecha (solo fechas con al menos min_obs empresas); sobrescribe
+            - rank: percentil dentro de la fecha en {factor}_rank (0-1]
+            - zscore: (x - media) / desviación de la fecha en {factor}_z
+        keep_raw: guardar el valor original en {factor}_raw (más memoria)
+        inplace: modificar panel en lugar de una copia
+
+    Returns:
+        DataFrame con los factores normalizados
+    """
+    unknown = set(methods) - set(METHODS)
+    if unknown:
+        raise ValueError(f"Métodos desconocidos: {', '.join(sorted(unknown))}")
+
+    df = panel if inplace else panel.copy()
+    factors = [f for f in factors if f in df.columns]
+    if not factors:
+        return df
+
+    codes, _ = pd.factorize(df[date_col], sort=True)
+    keys = np.where(codes >= 0, codes, np.nan)  # groupby ignora las filas sin fecha
+    values = np.array(df[factors], dtype=float)  # Copia editable
+    values[~np.isfinite(values)] = np.nan
+
+    if keep_raw:
+        for i, factor in enumerate(factors):
+            df[f'{factor}_raw'] = values[:, i]
+
+    grouped = pd.DataFrame(values, columns=factors).groupby(keys, sort=True)
+
+    if 'winsorize' in methods:
+        low = _broadcast(grouped.quantile(lower), codes)
+        high = _broadcast(grouped.quantile(upper), codes)
+        enough = _broadcast(grouped.count(), codes) >= min_obs
+        clipped = np.clip(values, low, high)
+        values = np.where(enough & ~np.isnan(values), clipped, values)
+        df[factors] = values
+        grouped = pd.DataFrame(values, columns=factors).groupby(keys, sort=True)
+
+    if 'rank' in methods:
+        ranks = grouped.rank(pct=True).to_numpy()
+        for i, factor in enumerate(factors):
+            df[f'{factor}_rank'] = ranks[:, i]
+
+    if 'zscore' in methods:
+        mean = _broadcast(grouped.mean(), codes)
+        std = _broadcast(grouped.std(), codes)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = (values - mean) / std
+        z[~np.isfinite(z)] = np.nan
+        for i, factor in enumerate(factors):
+            df[f'{factor}_z'] = z[:, i]
+
+    return df
@@ -0,0 +1,154 @@
+"""
+Panel Compacto en Memoria
+Datos contables una vez por reporte + índice hacia las filas diarias
+
+El output del notebook 02 repite cada valor contable en todos los días de
+mercado (float64). Aquí:
+- reports: una fila por (ticker, reporte) con las variables contables
+- daily: precios (float32 si la precisión lo permite), ticker categórico y
+  report_idx (int32) que apunta a la fila de reports vigente ese día
+"""
+
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits']
+
+
+def _downcast(values, rtol=1e-6):
+    """float32 (o entero pequeño) si la conversión no pierde más de rtol"""
+    if not pd.api.types.is_float_dtype(values) and not pd.api.types.is_integer_dtype(values):
+        return values
+    array = values.to_numpy()
+
+    finite = array[np.isfinite(array)] if array.dtype.kind == 'f' else array
+    if finite.size and np.all(np.mod(finite, 1) == 0) and not np.isnan(array).any():
+        return pd.to_numeric(values, downcast='integer')
+
+    as_f32 = array.astype(np.float32)
+    if np.allclose(as_f32, array, rtol=rtol, atol=0, equal_nan=True):
+        return pd.Series(as_f32, index=values.index, name=values.name)
+    return values
+
+
+class CompactPanel:
+    """
+    Panel ticker x día con las variables contables guardadas por reporte.
+
+    Ejemplo:
+        compact = CompactPanel.from_daily(df_final)
+        compact.memory_report(df_final)
+        df = compact.to_daily(['Close', 'at', 'seq'])
+    """
+
+    def __init__(self, daily, reports, ticker_col='ticker', date_col='date_market',
+                 report_key='date_accounting'):
+        self.daily = daily
+        self.reports = reports
+        self.ticker_col = ticker_col
+        self.date_col = date_col
+        self.report_key = report_key
+
+    @classmethod
+    def from_daily(cls, panel, ticker_col='ticker', date_col='date_market',
+                   report_key='date_accounting', daily_columns=None, rtol=1e-6):
+        """
+        Convierte un panel diario "ancho" (formato del notebook 02 / PIT) en
+        la representación compacta.
+
+        Se tratan como diarias las columnas de precio y daily_columns; el
+        resto se asume constante dentro de cada (ticker, report_key).
+        """
+        keys = [ticker_col, report_key]
+        daily_cols = [c for c in panel.columns
+                      if c in PRICE_COLUMNS or c in (daily_columns or ())]
+        report_cols = [c for c in panel.columns if c not in keys + [date_col] + daily_cols]
+
+        reports = (panel[keys + report_cols]
+                   .dropna(subset=[report_key])
+                   .drop_duplicates(keys)
+                   .sort_values(keys, kind='stable')
+                   .reset_index(drop=True))
+        tickers = pd.CategoricalDtype(sorted(panel[ticker_col].dropna().unique()))
+        reports[ticker_col] = reports[ticker_col].astype(tickers)
+
+        report_index = pd.MultiIndex.from_frame(reports[keys].astype({ticker_col: object}))
+        report_idx = report_index.get_indexer(
+            pd.MultiIndex.from_frame(panel[keys].astype({ticker_col: object})))
+
+        daily = pd.DataFrame({
+            ticker_col: pd.Categorical(panel[ticker_col].to_numpy(), dtype=tickers),
+            date_col: panel[date_col].to_numpy(),
+        })
+        for col in daily_cols:
+            daily[col] = _downcast(panel[col].reset_index(drop=True), rtol)
+        daily['report_idx'] = report_idx.astype(np.int32)
+
+        return cls(daily, reports, ticker_col, date_col, report_key)
+
+    @property
+    def report_columns(self):
+        return [c for c in self.reports.columns if c not in (self.ticker_col, self.report_key)]
+
+    def expand(self, values):
+        """Lleva un array alineado con reports (uno por reporte) a las filas diarias"""
+        values = np.asarray(values, dtype=float)
+        idx = self.daily['report_idx'].to_numpy()
+        out = values[np.clip(idx, 0, None)] if len(values) else np.full(len(idx), np.nan)
+        out[idx < 0] = np.nan
+        return out
+
+    def column(self, name):
+        """Valores diarios de una columna (las contables se expanden con report_idx)"""
+        if name in self.daily.columns:
+            return self.daily[name].to_numpy()
+        return self.expand(self.reports[name].to_numpy(dtype=float))
+
+    def to_daily(self, columns=None):
+        """Reconstruye el panel diario ancho (solo con columns si se indican)"""
+        daily_cols = [c for c in self.daily.columns if c != 'report_idx']
+        if columns is None:
+            columns = daily_cols + [self.report_key] + self.report_columns
+        columns = [c for c in columns if c not in (self.ticker_col, self.date_col)]
+
+        out = self.daily[[self.ticker_col, self.date_col]].copy()
+        idx = self.daily['report_idx'].to_numpy()
+        for col in columns:
+            if col == self.report_key:
+                keys = self.reports[self.report_key].to_numpy()
+                out[col] = pd.Series(keys[np.clip(idx, 0, None)]).where(idx >= 0).to_numpy()
+            else:
+                out[col] = self.column(col)
+        return out
+
+    def memory_usage(self):
+        return {
+            'daily': int(self.daily.memory_usage(deep=True).sum()),
+            'reports': int(self.reports.memory_usage(deep=True).sum()),
+        }
+
+    def memory_report(self, original=None):
+        """Compara la memoria del layout compacto con el panel diario original"""
+        usage = self.memory_usage()
+        compact_total = usage['daily'] + usage['reports']
+        report = {
+            'rows_daily': len(self.daily),
+            'rows_reports': len(self.reports),
+            'compact_bytes': compact_total,
+            'daily_bytes': usage['daily'],
+            'reports_bytes': usage['reports'],
+        }
+
+        print(f"\n🧮 Memoria del panel compacto:")
+        print(f"   Diario ({len(self.daily):,} filas): {usage['daily'] / 1024 ** 2:8.1f} MB")
+        print(f"   Reportes ({len(self.reports):,} filas): {usage['reports'] / 1024 ** 2:8.1f} MB")
+        print(f"   Total compacto: {compact_total / 1024 ** 2:8.1f} MB")
+
+        if original is not None:
+            original_bytes = int(original.memory_usage(deep=True).sum())
+            report['original_bytes'] = original_bytes
+            report['ratio'] = original_bytes / compact_total if compact_total else float('nan')
+            print(f"   Layout original: {original_bytes / 1024 ** 2:8.1f} MB "
+                  f"({report['ratio']:.1f}x más grande)")
+
+        return report
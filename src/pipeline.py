@@ -0,0 +1,176 @@
+"""
+Pipeline de Factores por Streaming (out-of-core)
+raw storage -> mapeo -> merge PIT -> factores -> escritura, por bloques de tickers
+
+Cada bloque de chunk_size tickers recorre las etapas como un generador, así
+la memoria pico depende del tamaño del bloque (x workers) y no del universo.
+"""
+
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.factor_cache import FactorCache
+from src.factor_calculator import FactorCalculator, DEFAULT_FACTORS
+from src.instrumentation import RunMetrics
+from src.point_in_time import load_fundamentals, merge_point_in_time, DEFAULT_LAG_MONTHS, PRICE_COLUMNS
+
+
+def iter_ticker_chunks(tickers, chunk_size):
+    """Bloques consecutivos de tickers"""
+    for i in range(0, len(tickers), chunk_size):
+        yield tickers[i:i + chunk_size]
+
+
+# ===== ETAPAS =====
+
+def read_stage(storage, chunks, metrics=None):
+    """Lee precios y estados (ya mapeados a códigos del paper) de cada bloque"""
+    metrics = metrics or RunMetrics()
+    for tickers in chunks:
+        with metrics.stage('read') as info:
+            market = storage.read('market', tickers, columns=PRICE_COLUMNS)
+            fundamentals = load_fundamentals(storage, tickers)
+            info['rows'] = len(market) + len(fundamentals)
+        yield tickers, market, fundamentals
+
+
+def pit_stage(items, lag_months=DEFAULT_LAG_MONTHS, metrics=None):
+    """Merge point-in-time de cada bloque"""
+    metrics = metrics or RunMetrics()
+    for tickers, market, fundamentals in items:
+        if market.empty or fundamentals.empty:
+            yield tickers, None
+            continue
+        with metrics.stage('pit') as info:
+            panel = merge_point_in_time(market, fundamentals, lag_months=lag_months)
+            info['rows'] = len(panel)
+        yield tickers, panel
+
+
+def factor_stage(items, factors=None, keep_inputs=False, cache=None, metrics=None):
+    """
+    Factores de cada bloque; por defecto solo se conservan claves + factores.
+    Con cache (FactorCache) solo se recalculan los tickers cuyos inputs cambiaron.
+    """
+    metrics = metrics or RunMetrics()
+    if cache is not None:
+        cache.calculator.metrics = metrics
+    calculator = cache or FactorCalculator(verbose=False, metrics=metrics)
+    factors = list(factors or DEFAULT_FACTORS)
+    for tickers, panel in items:
+        if panel is None:
+            yield tickers, None
+            continue
+        with metrics.stage('factors', rows=len(panel)):
+            result = calculator.compute(panel, factors)
+            if not keep_inputs:
+                keys = ['ticker', 'date_market', 'date_accounting']
+                result = result[keys + [f for f in factors if f in result.columns]]
+        yield tickers, result
+
+
+def stream_factors(storage, tickers=None, chunk_size=100, factors=None,
+                   lag_months=DEFAULT_LAG_MONTHS, keep_inputs=False, cache=None, metrics=None):
+    """
+    Generador de (tickers del bloque, DataFrame de factores) bloque a bloque.
+    Nada se materializa para todo el universo.
+    """
+    metrics = metrics or RunMetrics()
+    tickers = list(tickers or storage.tickers('market'))
+    items = read_stage(storage, iter_ticker_chunks(tickers, chunk_size), metrics)
+    items = pit_stage(items, lag_months, metrics)
+    return factor_stage(items, factors, keep_inputs, cache, metrics)
+
+
+# ===== EJECUCIÓN =====
+
+def _write_chunk(result, output_dir, part):
+    path = f"{output_dir}/factors-{part:05d}.parquet"
+    tmp_path = f"{output_dir}/.factors-{part:05d}.parquet.tmp"
+    result.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _process_chunk(args):
+    """Trabajo de un worker: un bloque completo de punta a punta"""
+    storage, tickers, part, output_dir, factors, lag_months, keep_inputs, cache_dir = args
+    t0 = perf_counter()
+    metrics = RunMetrics(f'part-{part:05d}')
+    cache = FactorCache(cache_dir) if cache_dir else None
+    _, result = next(stream_factors(storage, tickers, len(tickers) or 1,
+                                    factors, lag_months, keep_inputs, cache, metrics))
+    summary = {'part': part, 'tickers': len(tickers), 'rows': 0, 'path': None,
+               'cache_hits': cache.stats['hits'] if cache else 0,
+               'cache_misses': cache.stats['misses'] if cache else 0}
+    if result is not None and not result.empty:
+        with metrics.stage('write', rows=len(result)):
+            summary['path'] = _write_chunk(result, output_dir, part)
+        summary['rows'] = len(result)
+    summary['seconds'] = perf_counter() - t0
+    summary['metrics'] = metrics.report()  # Dict simple: vuelve bien desde otro proceso
+    return summary
+
+
+def run_pipeline(storage, output_dir="../data/processed/factors", tickers=None,
+                 chunk_size=100, workers=1, factors=None,
+                 lag_months=DEFAULT_LAG_MONTHS, keep_inputs=False, cache_dir=None,
+                 report_path=None, verbose=True):
+    """
+    Ejecuta el pipeline completo y escribe un Parquet por bloque en output_dir.
+
+    Con workers > 1 los bloques se procesan en paralelo en procesos separados
+    (cada proceso lee su bloque del storage; solo vuelve un resumen).
+    Con cache_dir los factores de tickers sin cambios salen de FactorCache.
+    Los tiempos por etapa (read, pit, factors, factor:<nombre>, write) se
+    suman en un RunMetrics; con report_path el reporte se guarda en JSON o Parquet.
+
+    Returns:
+        dict con la lista de bloques escritos, totales y el reporte de métricas
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    for old in glob.glob(f"{output_dir}/factors-*.parquet"):
+        os.remove(old)  # Bloques de una corrida anterior
+    tickers = list(tickers or storage.tickers('market'))
+    jobs = [(storage, chunk, part, output_dir, factors, lag_months, keep_inputs, cache_dir)
+            for part, chunk in enumerate(iter_ticker_chunks(tickers, chunk_size))]
+
+    log = print if verbose else (lambda *args, **kwargs: None)
+    log(f"\n🚀 Pipeline de factores: {len(tickers)} tickers, {len(jobs)} bloques, "
+        f"{workers} worker(s)")
+    t0 = perf_counter()
+    metrics = RunMetrics('pipeline')
+
+    def collect(summary):
+        metrics.merge(summary.pop('metrics'))
+        parts.append(summary)
+        log(f"   ✓ Bloque {summary['part']}: {summary['rows']:,} filas "
+            f"({summary['seconds']:.1f}s)")
+
+    parts = []
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for summary in executor.map(_process_chunk, jobs):
+                collect(summary)
+    else:
+        for job in jobs:
+            collect(_process_chunk(job))
+
+    elapsed = perf_counter() - t0
+    total_rows = sum(p['rows'] for p in parts)
+    hits = sum(p['cache_hits'] for p in parts)
+    misses = sum(p['cache_misses'] for p in parts)
+    log(f"\n✅ Pipeline completado: {total_rows:,} filas en {elapsed:.1f}s")
+    if cache_dir:
+        log(f"   Cache de factores: {hits} tickers reutilizados, {misses} recalculados")
+    log(f"   Salida: {output_dir}")
+
+    totals = {'rows': total_rows, 'tickers': len(tickers), 'seconds': elapsed,
+              'cache_hits': hits, 'cache_misses': misses}
+    if report_path:
+        metrics.write_report(report_path, extra={'totals': totals})
+    return {'parts': parts, **totals, 'report': metrics.report(extra={'totals': totals})}
@@ -0,0 +1,127 @@
+"""
+Unión Point-in-Time (PIT) de Datos Contables y de Mercado
+Un solo merge_asof agrupado por ticker para todo el universo
+
+Reemplaza el merge por ticker del notebook 02 (lag de 4 meses) y el
+segundo merge_asof de shares outstanding del notebook 03.
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.diccionario_variables import rename_to_paper_codes
+
+# "Accounting variables available 4 months after fiscal period end"
+DEFAULT_LAG_MONTHS = 4
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def _naive_dates(values):
+    """Fechas sin zona horaria (los CSV de Yahoo traen offsets -05:00/-04:00)"""
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        values = pd.to_datetime(values.astype(str).str[:10])
+    elif isinstance(values.dtype, pd.DatetimeTZDtype):
+        values = values.dt.tz_localize(None)
+    return values.dt.normalize().astype('datetime64[ns]')
+
+
+def load_fundamentals(storage, tickers=None):
+    """
+    Lee los estados financieros crudos del storage y los deja en códigos del
+    paper: columnas ticker, date_fin, códigos (at, sale, ni...) y
+    shares_outstanding (de 'Ordinary Shares Number' del balance).
+    """
+    raw = storage.read('financial', tickers)
+    raw = raw.rename(columns={'Ordinary Shares Number': 'shares_outstanding'})
+    fundamentals, _ = rename_to_paper_codes(raw, keep=['ticker', 'Date', 'shares_outstanding'])
+    fundamentals = fundamentals.rename(columns={'Date': 'date_fin'})
+    fundamentals['date_fin'] = _naive_dates(fundamentals['date_fin'])
+
+    # CapEx a valor absoluto (viene negativo en cashflow)
+    if 'capx' in fundamentals.columns:
+        fundamentals['capx'] = fundamentals['capx'].abs()
+    return fundamentals
+
+
+def merge_point_in_time(market, fundamentals, shares=None, lag_months=DEFAULT_LAG_MONTHS,
+                        ticker_col='ticker', market_date='Date', fiscal_date='date_fin',
+                        keep_fiscal_date=False, dropna=True):
+    """
+    Asigna a cada día de mercado el último reporte disponible de su ticker.
+
+    Un reporte con fecha fiscal f se considera público desde f + lag_months.
+    Todas las empresas se alinean en un solo pd.merge_asof(by=ticker_col).
+
+    Args:
+        market: precios largos (ticker_col, market_date, Open, ..., Close, Volume)
+        fundamentals: reportes largos (ticker_col, fiscal_date, códigos del paper)
+        shares: opcional, (ticker_col, fiscal_date, shares_outstanding) si no
+            vienen ya dentro de fundamentals
+        keep_fiscal_date: conservar la fecha fiscal del reporte como 'date_fin'
+        dropna: eliminar los días anteriores al primer reporte disponible
+
+    Returns:
+        Panel con ticker, date_market, date_accounting (fecha de disponibilidad),
+        precios y variables contables, ordenado por (ticker, date_market).
+    """
+    lag = pd.DateOffset(months=lag_months)
+
+    mkt = market.copy()
+    mkt[market_date] = _naive_dates(mkt[market_date])
+    mkt = mkt.sort_values(market_date, kind='stable')
+
+    fund = fundamentals.copy()
+    fund[fiscal_date] = _naive_dates(fund[fiscal_date])
+    fund['date_accounting'] = fund[fiscal_date] + lag
+    fund = fund.sort_values('date_accounting', kind='stable')
+    if not keep_fiscal_date:
+        fund = fund.drop(columns=fiscal_date)
+
+    panel = pd.merge_asof(
+        mkt, fund,
+        left_on=market_date, right_on='date_accounting',
+        by=ticker_col, direction='backward'
+    )
+
+    if shares is not None:
+        sh = shares[[ticker_col, fiscal_date, 'shares_outstanding']].copy()
+        sh['_shares_available'] = _naive_dates(sh[fiscal_date]) + lag
+        sh = sh.drop(columns=fiscal_date).sort_values('_shares_available', kind='stable')
+        panel = pd.merge_asof(
+            panel.drop(columns='shares_outstanding', errors='ignore'), sh,
+            left_on=market_date, right_on='_shares_available',
+            by=ticker_col, direction='backward'
+        ).drop(columns='_shares_available')
+
+    if dropna:
+        panel = panel.dropna(subset=['date_accounting'])
+
+    panel = panel.rename(columns={market_date: 'date_market'})
+    panel = panel.sort_values([ticker_col, 'date_market'], kind='stable').reset_index(drop=True)
+
+    # Fechas primero, luego precio, luego contabilidad
+    first = [ticker_col, 'date_market', 'date_accounting'] + (['date_fin'] if keep_fiscal_date else [])
+    prices = [c for c in PRICE_COLUMNS if c in panel.columns]
+    rest = [c for c in panel.columns if c not in first + prices]
+    return panel[first + prices + rest]
+
+
+def write_point_in_time(panel, path, ticker_col='ticker', verbose=True):
+    """
+    Guarda el panel PIT en Parquet comprimido (ticker categórico, ordenado por
+    ticker y fecha para que los row groups filtren bien por ticker).
+    Con verbose=False no imprime nada.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    panel = panel.assign(**{ticker_col: panel[ticker_col].astype('category')})
+    panel.to_parquet(path, index=False, compression='zstd')
+    if verbose:
+        print(f"💾 Panel PIT guardado: {path} ({len(panel):,} filas, "
+              f"{os.path.getsize(path) / 1024 ** 2:.1f} MB)")
+    return path
@@ -0,0 +1,130 @@
+"""
+Rate Limiter para Alpha Vantage
+Ventanas deslizantes por minuto y por día, compartidas entre threads
+"""
+
+import json
+import os
+import threading
+from collections import deque
+from time import sleep, time
+
+
+class RateLimiter:
+    """
+    Limitador de llamadas con dos ventanas deslizantes:
+    - calls_per_minute llamadas en cualquier ventana de 60s
+    - daily_limit llamadas en cualquier ventana de 24h
+
+    Solo bloquea cuando el presupuesto de la ventana se agotó. El historial
+    de la ventana diaria se guarda en state_path para sobrevivir reinicios.
+    """
+
+    MINUTE = 60
+    DAY = 24 * 60 * 60
+
+    def __init__(self, calls_per_minute, daily_limit, state_path=None):
+        self.calls_per_minute = calls_per_minute
+        self.daily_limit = daily_limit
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._minute_calls = deque()
+        self._day_calls = deque()
+        self._load_state()
+
+    # ===== ESTADO PERSISTENTE =====
+
+    def _load_state(self):
+        """Carga las llamadas de las últimas 24h desde disco"""
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path) as f:
+                calls = json.load(f).get('calls', [])
+        except (OSError, ValueError):
+            return
+
+        now = time()
+        self._day_calls.extend(sorted(t for t in calls if now - t < self.DAY))
+        self._minute_calls.extend(t for t in self._day_calls if now - t < self.MINUTE)
+
+    def _save_state(self):
+        """Escritura atómica del historial diario (se llama con el lock tomado)"""
+        if not self.state_path:
+            return
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'calls': list(self._day_calls)}, f)
+        os.replace(tmp_path, self.state_path)
+
+    # ===== VENTANAS =====
+
+    def _purge(self, now):
+        while self._minute_calls and now - self._minute_calls[0] >= self.MINUTE:
+            self._minute_calls.popleft()
+        while self._day_calls and now - self._day_calls[0] >= self.DAY:
+            self._day_calls.popleft()
+
+    @property
+    def calls_today(self):
+        """Llamadas realizadas en las últimas 24h"""
+        with self._lock:
+            self._purge(time())
+            return len(self._day_calls)
+
+    @property
+    def remaining_today(self):
+        return max(self.daily_limit - self.calls_today, 0)
+
+    @property
+    def next_daily_slot(self):
+        """Momento (epoch) en que se libera un cupo diario; ahora si ya hay cupo"""
+        with self._lock:
+            now = time()
+            self._purge(now)
+            excess = len(self._day_calls) - self.daily_limit
+            if excess < 0:
+                return now
+            return self._day_calls[excess] + self.DAY
+
+    def mark_exhausted(self):
+        """
+        El servidor avisó que la cuota del día se agotó: se completa la
+        ventana diaria para que acquire() devuelva False hasta que se libere.
+        """
+        with self._lock:
+            now = time()
+            self._purge(now)
+            while len(self._day_calls) < self.daily_limit:
+                self._day_calls.append(now)
+            self._save_state()
+
+    def acquire(self):
+        """
+        Reserva una llamada, esperando solo si la ventana por minuto está llena.
+
+        Returns:
+            True si la llamada quedó reservada, False si se agotó el límite
+            diario (no tiene sentido bloquear hasta el día siguiente).
+        """
+        while True:
+            with self._lock:
+                now = time()
+                self._purge(now)
+
+                if len(self._day_calls) >= self.daily_limit:
+                    return False
+
+                if len(self._minute_calls) < self.calls_per_minute:
+                    self._minute_calls.append(now)
+                    self._day_calls.append(now)
+                    self._save_state()
+                    return True
+
+                wait = self.MINUTE - (now - self._minute_calls[0])
+
+            # Esperar fuera del lock para no bloquear a los demás threads
+            sleep(max(wait, 0.01))
@@ -0,0 +1,161 @@
+"""
+Cache en Disco de Respuestas (Yahoo Finance + Alpha Vantage)
+Direccionado por contenido, con TTL por tipo de dato y desalojo LRU por tamaño
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+from time import time
+
+DAY = 24 * 60 * 60
+
+# TTL por tipo de dato (segundos). None = no expira
+DEFAULT_TTL = {
+    'prices': 1 * DAY,        # Precios diarios
+    'statements': 90 * DAY,   # Estados financieros (cambian cada trimestre)
+    'info': 7 * DAY,          # Ticker.info (shares actuales, etc.)
+    'factors': None,          # Factores calculados (la clave ya incluye los inputs)
+}
+
+_MISSING = object()
+
+
+class CacheMiss(LookupError):
+    """No hay entrada en cache (en modo offline no se puede ir a la red)"""
+
+
+class ResponseCache:
+    """
+    Cache de respuestas en disco.
+
+    La clave es el hash de (source, endpoint, symbol, start, end), así dos
+    peticiones iguales comparten entrada sin importar quién las haga. Cada
+    entrada se guarda en un pickle; el mtime del archivo marca el último uso
+    y se usa para desalojar las menos usadas cuando se supera max_bytes.
+
+    Con offline=True nunca se llama al loader: se sirve lo que haya en cache
+    (aunque esté vencido) y si no hay entrada se lanza CacheMiss.
+    """
+
+    def __init__(self, cache_dir="../data/cache", ttl=None, max_bytes=1024 ** 3, offline=False):
+        self.cache_dir = cache_dir
+        self.ttl = {**DEFAULT_TTL, **(ttl or {})}
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.stats = {'hits': 0, 'misses': 0, 'stale': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size = sum(os.path.getsize(p) for p, _ in self._entries())
+
+    # ===== CLAVES Y RUTAS =====
+
+    @staticmethod
+    def make_key(source, endpoint, symbol, start=None, end=None):
+        payload = json.dumps([source, endpoint, symbol, str(start), str(end)])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.pkl")
+
+    def _entries(self):
+        """(ruta, mtime) de todas las entradas en disco"""
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith('.pkl'):
+                    path = os.path.join(root, name)
+                    yield path, os.path.getmtime(path)
+
+    # ===== API =====
+
+    def get(self, source, endpoint, symbol, data_type, start=None, end=None, default=_MISSING):
+        """
+        Retorna el valor en cache si existe y no venció su TTL.
+        Sin default, una ausencia lanza CacheMiss.
+        """
+        path = self._path(self.make_key(source, endpoint, symbol, start, end))
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            entry = None
+
+        ttl = self.ttl.get(data_type)
+        fresh = entry is not None and (ttl is None or time() - entry['created'] < ttl)
+
+        with self._lock:
+            if entry is not None and (fresh or self.offline):
+                self.stats['hits'] += 1
+            else:
+                self.stats['stale' if entry is not None else 'misses'] += 1
+                if default is _MISSING:
+                    raise CacheMiss(f"{source}/{endpoint}/{symbol}")
+                return default
+
+            # Marcar como usado recientemente (LRU); si otro proceso ya lo
+            # desalojó, el valor leído sigue siendo válido
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        return entry['value']
+
+    def put(self, source, endpoint, symbol, value, start=None, end=None):
+        """Guarda un valor (escritura atómica) y desaloja si se supera max_bytes"""
+        path = self._path(self.make_key(source, endpoint, symbol, start, end))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'created': time(), 'value': value}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._size += os.path.getsize(path) - old_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def fetch(self, source, endpoint, symbol, loader, data_type, start=None, end=None, cacheable=None):
+        """
+        Valor en cache o, si no hay, loader() (y se guarda el resultado).
+
+        cacheable(value) decide si una respuesta se guarda; por defecto
+        se guarda todo lo que no sea None.
+        """
+        value = self.get(source, endpoint, symbol, data_type, start, end, default=None)
+        if value is not None:
+            return value
+        if self.offline:
+            raise CacheMiss(f"{source}/{endpoint}/{symbol} (modo offline)")
+
+        value = loader()
+        if value is not None and (cacheable is None or cacheable(value)):
+            self.put(source, endpoint, symbol, value, start, end)
+        return value
+
+    def _evict(self):
+        """Borra las entradas menos usadas hasta bajar del 90% de max_bytes"""
+        target = self.max_bytes * 0.9
+        for path, _ in sorted(self._entries(), key=lambda e: e[1]):
+            if self._size <= target:
+                break
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                continue
+            self._size -= size
+            self.stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            for path, _ in list(self._entries()):
+                os.remove(path)
+            self._size = 0
+
+    @property
+    def size_bytes(self):
+        return self._size
@@ -0,0 +1,278 @@
+"""
+Scores Compuestos de Calidad: Piotroski F, Altman Z y Ohlson O
+Basado en Jensen, Kelly & Pedersen (2023) - Global Factor Data
+
+- Los componentes se calculan una sola vez por reporte (con rezagos por
+  shifts agrupados) y se comparten entre scores
+- Las intermedias (nwc, ffo, me) vienen del DerivedVariableEngine
+- Componentes faltantes explícitos: cada score exige un mínimo de
+  componentes disponibles (por defecto todos); si no, queda en NaN
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.derived_variables import DerivedVariableEngine
+from src.growth import report_lags, restore_order
+from src.panel import CompactPanel
+
+# score -> {componente: peso}; F suma señales binarias (peso 1)
+SCORE_COMPONENTS = {
+    "f_score": {
+        "f_roa": 1, "f_cfo": 1, "f_droa": 1, "f_acc": 1, "f_dlever": 1,
+        "f_dliquid": 1, "f_eqis": 1, "f_dgm": 1, "f_dato": 1,
+    },
+    "z_score": {
+        "z_wc": 1.2, "z_re": 1.4, "z_ebit": 3.3, "z_me": 0.6, "z_sale": 1.0,
+    },
+    "o_score": {
+        "o_size": -0.407, "o_lev": 6.03, "o_wc": -1.43, "o_cl_ca": 0.076,
+        "o_neg_eq": -1.72, "o_roa": -2.37, "o_ffo": -1.83, "o_neg_ni": 0.285,
+        "o_dni": -0.52,
+    },
+}
+
+SCORE_INTERCEPTS = {"f_score": 0.0, "z_score": 0.0, "o_score": -1.32}
+
+# Variables base/derivadas que usa cada score
+SCORE_INPUTS = {
+    "f_score": ["ni", "at", "ocf", "debtlt", "ca", "cl", "eqis", "gp", "sale"],
+    "z_score": ["nwc", "at", "re", "ebit", "lt", "sale"],
+    "o_score": ["at", "lt", "nwc", "cl", "ca", "ni", "ffo"],
+}
+
+
+def _binary(condition, *inputs):
+    """1/0 según condition; NaN si falta algún input"""
+    missing = np.zeros(len(condition), dtype=bool)
+    for values in inputs:
+        missing |= np.isnan(values)
+    return np.where(missing, np.nan, condition.astype(float))
+
+
+def _ratio(numerator, denominator):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = numerator / denominator
+    out[~np.isfinite(out)] = np.nan
+    return out
+
+
+def score_components(reports, scores=None, ticker_col="ticker", date_col="date_fin",
+                     periods_per_year=1, engine=None):
+    """
+    Componentes de los scores a nivel reporte.
+
+    z_me (me / lt) solo se calcula si reports ya trae 'me'; en paneles
+    diarios score_stage lo arma con el precio de cada día.
+
+    Returns:
+        DataFrame (mismo orden que reports) con una columna por componente
+    """
+    scores = list(scores or SCORE_COMPONENTS)
+    engine = engine or DerivedVariableEngine()
+    inputs = list(dict.fromkeys(c for s in scores for c in SCORE_INPUTS[s]))
+
+    derived = [c for c in inputs if c not in reports.columns and c in engine.formulas]
+    df = engine.evaluate(reports, derived, by=ticker_col) if derived else reports
+    if "gp" in inputs and {"sale", "cogs"} <= set(df.columns):
+        gp = df["gp"] if "gp" in df.columns else np.nan
+        df = df.assign(gp=pd.Series(gp, index=df.index).fillna(df["sale"] - df["cogs"]))
+    if "z_score" in scores and "me" in df.columns:
+        inputs.append("me")
+
+    present = [c for c in inputs if c in df.columns]
+    order, cur, lags = report_lags(df, present, [1 * periods_per_year, 2 * periods_per_year],
+                                   ticker_col, date_col)
+    lag1, lag2 = lags[1 * periods_per_year], lags[2 * periods_per_year]
+    nan = np.full(len(df), np.nan)
+
+    def now(col):
+        return cur[col].to_numpy() if col in cur.columns else nan
+
+    def prev(col, k=1):
+        frame = lag1 if k == 1 else lag2
+        return frame[col].to_numpy() if col in frame.columns else nan
+
+    comp = {}
+    if "f_score" in scores:
+        roa = _ratio(now("ni"), prev("at"))
+        roa_l1 = _ratio(prev("ni"), prev("at", 2))
+        cfo = _ratio(now("ocf"), prev("at"))
+        lever = _ratio(now("debtlt"), now("at"))
+        lever_l1 = _ratio(prev("debtlt"), prev("at"))
+        liquid = _ratio(now("ca"), now("cl"))
+        liquid_l1 = _ratio(prev("ca"), prev("cl"))
+        gm = _ratio(now("gp"), now("sale"))
+        gm_l1 = _ratio(prev("gp"), prev("sale"))
+        ato = _ratio(now("sale"), prev("at"))
+        ato_l1 = _ratio(prev("sale"), prev("at", 2))
+        eqis = now("eqis")
+
+        comp["f_roa"] = _binary(roa > 0, roa)
+        comp["f_cfo"] = _binary(cfo > 0, cfo)
+        comp["f_droa"] = _binary(roa > roa_l1, roa, roa_l1)
+        comp["f_acc"] = _binary(cfo > roa, cfo, roa)
+        comp["f_dlever"] = _binary(lever < lever_l1, lever, lever_l1)
+        comp["f_dliquid"] = _binary(liquid > liquid_l1, liquid, liquid_l1)
+        comp["f_eqis"] = _binary(eqis <= 0, eqis)
+        comp["f_dgm"] = _binary(gm > gm_l1, gm, gm_l1)
+        comp["f_dato"] = _binary(ato > ato_l1, ato, ato_l1)
+
+    if "z_score" in scores:
+        at = now("at")
+        comp["z_wc"] = _ratio(now("nwc"), at)
+        comp["z_re"] = _ratio(now("re"), at)
+        comp["z_ebit"] = _ratio(now("ebit"), at)
+        comp["z_me"] = _ratio(now("me"), now("lt"))
+        comp["z_sale"] = _ratio(now("sale"), at)
+
+    if "o_score" in scores:
+        at, lt, ni, ni_l1 = now("at"), now("lt"), now("ni"), prev("ni")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            size = np.log(at / 1e6)  # Activos en millones (sin deflactar por IPC)
+        comp["o_size"] = np.where(at > 0, size, np.nan)
+        comp["o_lev"] = _ratio(lt, at)
+        comp["o_wc"] = _ratio(now("nwc"), at)
+        comp["o_cl_ca"] = _ratio(now("cl"), now("ca"))
+        comp["o_neg_eq"] = _binary(lt > at, lt, at)
+        comp["o_roa"] = _ratio(ni, at)
+        comp["o_ffo"] = _ratio(now("ffo"), lt)
+        comp["o_neg_ni"] = _binary((ni < 0) & (ni_l1 < 0), ni, ni_l1)
+        comp["o_dni"] = _ratio(ni - ni_l1, np.abs(ni) + np.abs(ni_l1))
+
+    return pd.DataFrame({name: restore_order(order, values) for name, values in comp.items()},
+                        index=reports.index)
+
+
+def _weighted_sum(components, weights):
+    """Suma ponderada de los componentes disponibles y cuántos hay (sin intercepto)"""
+    total = np.zeros(len(components[next(iter(weights))]))
+    count = np.zeros(len(total), dtype=np.int16)
+    for name, weight in weights.items():
+        values = np.asarray(components[name], dtype=float)
+        available = np.isfinite(values)
+        total += np.where(available, weight * values, 0.0)
+        count += available
+    return total, count
+
+
+def _apply_minimum(score, total, count, min_components):
+    need = (min_components or {}).get(score, len(SCORE_COMPONENTS[score]))
+    return np.where(count >= need, SCORE_INTERCEPTS[score] + total, np.nan)
+
+
+def combine_scores(components, scores=None, min_components=None):
+    """
+    Suma ponderada de componentes.
+
+    Args:
+        components: DataFrame o dict componente -> array
+        min_components: dict score -> mínimo de componentes disponibles
+            (por defecto todos). Con menos, el score queda en NaN; con al
+            menos ese mínimo, los componentes faltantes no suman.
+
+    Returns:
+        dict score -> (valores, número de componentes disponibles)
+    """
+    out = {}
+    for score in scores or SCORE_COMPONENTS:
+        total, count = _weighted_sum(components, SCORE_COMPONENTS[score])
+        out[score] = (_apply_minimum(score, total, count, min_components), count)
+    return out
+
+
+def compute_scores(reports, scores=None, ticker_col="ticker", date_col="date_fin",
+                   min_components=None, periods_per_year=1, keep_components=False):
+    """
+    F, Z y O score sobre un frame con una fila por reporte (p.ej. el output
+    de load_fundamentals). Z solo se calcula si reports trae 'me'.
+    """
+    scores = list(scores or SCORE_COMPONENTS)
+    components = score_components(reports, scores, ticker_col, date_col, periods_per_year)
+    out = reports.copy()
+    if keep_components:
+        out[list(components.columns)] = components
+    for score, (values, count) in combine_scores(components, scores, min_components).items():
+        out[score] = values
+        out[f"{score}_n"] = count
+    return out
+
+
+def _daily_me_lt(panel, compact):
+    """me / lt de cada día (Close * shares_outstanding, o la columna 'me' del panel)"""
+    def has(col):
+        return col in compact.daily.columns or col in compact.reports.columns
+
+    nan = np.full(len(compact.daily), np.nan)
+    if compact is not panel and "me" in panel.columns:
+        me = panel["me"].to_numpy(dtype=float)
+    elif has("Close") and has("shares_outstanding"):
+        me = compact.column("Close").astype(float) * compact.column("shares_outstanding")
+    else:
+        me = nan
+    return _ratio(me, compact.column("lt") if has("lt") else nan)
+
+
+def score_stage(panel, scores=None, ticker_col="ticker", date_col="date_market",
+                report_key="date_accounting", min_components=None, periods_per_year=1,
+                keep_components=False):
+    """
+    Scores para un panel diario (PIT) o un CompactPanel.
+
+    Componentes y sumas parciales salen una vez por reporte; a los días solo
+    se expanden el total y el conteo de cada score. Z agrega día a día su
+    término de mercado (0.6 * me / lt).
+
+    Returns:
+        CompactPanel con F/O en .reports y Z en .daily si la entrada era
+        CompactPanel; si no, copia del panel diario con los scores.
+    """
+    scores = list(scores or SCORE_COMPONENTS)
+    if isinstance(panel, CompactPanel):
+        compact = panel
+    else:
+        compact = CompactPanel.from_daily(panel, ticker_col, date_col, report_key)
+
+    reports = compact.reports.drop(columns="me", errors="ignore")
+    components = score_components(reports, scores, compact.ticker_col, compact.report_key,
+                                  periods_per_year)
+    partial = {}
+    for score in scores:
+        weights = {c: w for c, w in SCORE_COMPONENTS[score].items() if c != "z_me"}
+        partial[score] = _weighted_sum(components, weights)
+
+    daily = {}
+    for score, (total, count) in partial.items():
+        if score != "z_score" and compact is panel:
+            continue
+        total, count = compact.expand(total), np.nan_to_num(compact.expand(count)).astype(np.int16)
+        if score == "z_score":
+            me_lt = _daily_me_lt(panel, compact)
+            available = np.isfinite(me_lt)
+            total = total + np.where(available, SCORE_COMPONENTS[score]["z_me"] * me_lt, 0.0)
+            count = count + available
+        daily[score] = (_apply_minimum(score, total, count, min_components), count)
+
+    if compact is panel:
+        for score, (total, count) in partial.items():
+            if score != "z_score":
+                compact.reports[score] = _apply_minimum(score, total, count, min_components)
+                compact.reports[f"{score}_n"] = count
+        if keep_components:
+            compact.reports[list(components.columns)] = components
+        if "z_score" in daily:
+            compact.daily["z_score"], compact.daily["z_score_n"] = daily["z_score"]
+        return compact
+
+    out = panel.copy()
+    if keep_components:
+        for name in components.columns:
+            out[name] = compact.expand(components[name])
+    for score, (values, count) in daily.items():
+        out[score] = values
+        out[f"{score}_n"] = count
+    return out
@@ -0,0 +1,279 @@
+"""
+Capa de Almacenamiento para Datos Crudos
+Backends intercambiables: CSV por ticker (formato original) o Parquet particionado
+"""
+
+import glob
+import io
+import os
+import shutil
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow es opcional: solo lo necesita ParquetStorage
+    pa = ds = pq = None
+
+# Tipos de datos guardados y su columna de fecha
+KINDS = {
+    'market': 'Date',
+    'financial': 'Date',
+    'av_income': 'fiscalDateEnding',
+    'av_balance': 'fiscalDateEnding',
+    'av_cashflow': 'fiscalDateEnding',
+}
+
+
+class CsvStorage:
+    """
+    Formato original: un CSV por ticker y tipo en root
+    ({ticker}_market_data.csv, {ticker}_financial_data.csv, {ticker}_av_income.csv...)
+    """
+
+    FILE_SUFFIX = {
+        'market': 'market_data',
+        'financial': 'financial_data',
+        'av_income': 'av_income',
+        'av_balance': 'av_balance',
+        'av_cashflow': 'av_cashflow',
+    }
+
+    def __init__(self, root="../data/raw"):
+        self.root = root
+
+    def path(self, kind, ticker):
+        return f"{self.root}/{ticker}_{self.FILE_SUFFIX[kind]}.csv"
+
+    def exists(self, kind, ticker):
+        return os.path.exists(self.path(kind, ticker))
+
+    def tickers(self, kind):
+        suffix = f"_{self.FILE_SUFFIX[kind]}.csv"
+        return sorted(os.path.basename(p)[:-len(suffix)]
+                      for p in glob.glob(f"{self.root}/*{suffix}"))
+
+    def write(self, kind, ticker, df):
+        """Reemplaza los datos del ticker (escritura atómica)"""
+        os.makedirs(self.root, exist_ok=True)
+        path = self.path(kind, ticker)
+        tmp_path = f"{path}.tmp"
+        df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        return path
+
+    def append(self, kind, ticker, df):
+        """
+        Copia + append + rename: un fallo a mitad nunca deja el CSV corrupto.
+
+        Las filas se escriben en el orden de columnas del header guardado; si
+        las columnas no son las mismas, se reescribe el archivo completo.
+        """
+        path = self.path(kind, ticker)
+        header = pd.read_csv(path, nrows=0).columns.tolist()
+        if set(header) != set(df.columns) or len(header) != len(df.columns):
+            stored = pd.read_csv(path)
+            return self.write(kind, ticker, pd.concat([stored, df], ignore_index=True))
+
+        df = df[header]
+        tmp_path = f"{path}.tmp"
+        shutil.copyfile(path, tmp_path)
+        with open(tmp_path, 'a', newline='') as f:
+            df.to_csv(f, index=False, header=False)
+        os.replace(tmp_path, path)
+        return path
+
+    def tail(self, kind, ticker, n_rows, block_size=64 * 1024):
+        """Header + últimas n_rows filas sin leer el CSV entero"""
+        with open(self.path(kind, ticker), 'rb') as f:
+            header = f.readline()
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            start = max(size - block_size, len(header))
+            f.seek(start)
+            block = f.read()
+
+        lines = block.splitlines()
+        if start > len(header):
+            lines = lines[1:]  # La primera línea del bloque puede estar cortada
+        tail = b"\n".join(lines[-n_rows:])
+        return pd.read_csv(io.BytesIO(header + tail))
+
+    def first_date(self, kind, ticker):
+        date_col = KINDS[kind]
+        return pd.read_csv(self.path(kind, ticker), usecols=[date_col], nrows=1)[date_col].iloc[0]
+
+    def read(self, kind, tickers=None, columns=None, start=None, end=None):
+        """
+        Lee uno o varios tickers en un solo DataFrame (con columna 'ticker').
+        En CSV el filtro de fechas se aplica después de parsear cada archivo.
+        """
+        date_col = KINDS[kind]
+        usecols = None
+        if columns is not None:
+            usecols = list(dict.fromkeys([date_col] + [c for c in columns if c != 'ticker']))
+
+        frames = []
+        for ticker in (tickers or self.tickers(kind)):
+            if not self.exists(kind, ticker):
+                continue
+            df = pd.read_csv(self.path(kind, ticker), usecols=usecols)
+            df.insert(0, 'ticker', ticker)
+            frames.append(df)
+
+        if not frames:
+            return pd.DataFrame(columns=['ticker'] + (usecols or []))
+
+        df = pd.concat(frames, ignore_index=True)
+        if start is not None or end is not None:
+            dates = pd.to_datetime(df[date_col].astype(str).str[:10])
+            mask = pd.Series(True, index=df.index)
+            if start is not None:
+                mask &= dates >= pd.Timestamp(start)
+            if end is not None:
+                mask &= dates <= pd.Timestamp(end)
+            df = df[mask].reset_index(drop=True)
+        return df
+
+
+class ParquetStorage:
+    """
+    Parquet particionado estilo Hive: {root}/{kind}/ticker={ticker}/part-NNNNN.parquet
+
+    - Tipos preservados (fechas como timestamp, números como float64)
+    - read() con proyección de columnas y filtros de ticker/fecha que pyarrow
+      empuja al escaneo (poda de particiones y de row groups)
+    - append() agrega un archivo nuevo a la partición sin reescribir lo anterior
+    """
+
+    def __init__(self, root="../data/raw_parquet"):
+        if pa is None:
+            raise ImportError("ParquetStorage requiere pyarrow (pip install pyarrow)")
+        self.root = root
+
+    def _partition_dir(self, kind, ticker):
+        return f"{self.root}/{kind}/ticker={ticker}"
+
+    def _parts(self, kind, ticker):
+        return sorted(glob.glob(f"{self._partition_dir(kind, ticker)}/part-*.parquet"))
+
+    def exists(self, kind, ticker):
+        return bool(self._parts(kind, ticker))
+
+    def tickers(self, kind):
+        dirs = glob.glob(f"{self.root}/{kind}/ticker=*")
+        return sorted(os.path.basename(d)[len('ticker='):] for d in dirs)
+
+    @staticmethod
+    def _normalize(kind, df):
+        """Fechas sin zona horaria y números en float64 (esquema estable entre tickers)"""
+        df = df.copy()
+        date_col = KINDS[kind]
+        if date_col in df.columns:
+            dates = df[date_col]
+            if isinstance(dates.dtype, pd.DatetimeTZDtype):
+                dates = dates.dt.tz_localize(None)
+            elif not pd.api.types.is_datetime64_dtype(dates):
+                # Texto tipo "2023-01-03 00:00:00-05:00": nos quedamos con la hora local
+                dates = pd.to_datetime(dates.astype(str).str[:19])
+            df[date_col] = dates.astype('datetime64[ns]')
+        for col in df.columns:
+            if col != date_col and pd.api.types.is_numeric_dtype(df[col]):
+                df[col] = df[col].astype('float64')
+        return df.drop(columns='ticker', errors='ignore')
+
+    def _write_table(self, kind, ticker, df, name):
+        """Escribe df en la partición como name (vía archivo oculto + rename)"""
+        directory = self._partition_dir(kind, ticker)
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{directory}/.{name}.tmp"
+        table = pa.Table.from_pandas(self._normalize(kind, df), preserve_index=False)
+        pq.write_table(table, tmp_path)
+        return tmp_path
+
+    def write(self, kind, ticker, df):
+        """Reemplaza la partición del ticker"""
+        tmp_path = self._write_table(kind, ticker, df, 'write')
+        for old in self._parts(kind, ticker):
+            os.remove(old)
+        os.replace(tmp_path, f"{self._partition_dir(kind, ticker)}/part-00000.parquet")
+        return self._partition_dir(kind, ticker)
+
+    def append(self, kind, ticker, df):
+        name = f"part-{len(self._parts(kind, ticker)):05d}.parquet"
+        tmp_path = self._write_table(kind, ticker, df, name)
+        os.replace(tmp_path, f"{self._partition_dir(kind, ticker)}/{name}")
+        return self._partition_dir(kind, ticker)
+
+    def tail(self, kind, ticker, n_rows):
+        last = pq.read_table(self._parts(kind, ticker)[-1]).to_pandas()
+        if len(last) < n_rows:
+            last = self.read(kind, [ticker]).drop(columns='ticker')
+        return last.tail(n_rows).reset_index(drop=True)
+
+    def first_date(self, kind, ticker):
+        date_col = KINDS[kind]
+        return pq.read_table(self._parts(kind, ticker)[0], columns=[date_col])[date_col][0].as_py()
+
+    def dataset(self, kind, tickers=None):
+        """
+        Dataset de pyarrow con el esquema unificado de sus particiones.
+
+        Con tickers se arma solo con los archivos de esas particiones: leer un
+        ticker o un bloque no abre el footer de todo el universo.
+        """
+        path = f"{self.root}/{kind}"
+        if tickers is None:
+            source = path
+        else:
+            source = [part for ticker in dict.fromkeys(tickers) for part in self._parts(kind, ticker)]
+        dataset = ds.dataset(source, format='parquet', partitioning='hive', partition_base_dir=path)
+        schemas = [frag.physical_schema for frag in dataset.get_fragments()]
+        if not schemas:
+            return dataset
+        schema = pa.unify_schemas(schemas).append(pa.field('ticker', pa.string()))
+        return ds.dataset(source, format='parquet', partitioning='hive', partition_base_dir=path,
+                          schema=schema)
+
+    def read(self, kind, tickers=None, columns=None, start=None, end=None):
+        """
+        Lee varios tickers con proyección (columns) y predicate pushdown
+        sobre ticker y fecha. Retorna un DataFrame con columna 'ticker'.
+        """
+        if not os.path.isdir(f"{self.root}/{kind}"):
+            return pd.DataFrame(columns=['ticker'] + list(columns or []))
+
+        dataset = self.dataset(kind, tickers)
+        if 'ticker' not in dataset.schema.names:  # Ninguna partición de esos tickers
+            return pd.DataFrame(columns=['ticker'] + list(columns or []))
+        date_col = KINDS[kind]
+
+        filtro = None
+        if tickers is not None:
+            filtro = ds.field('ticker').isin(list(tickers))
+        if start is not None:
+            cond = ds.field(date_col) >= pd.Timestamp(start)
+            filtro = cond if filtro is None else filtro & cond
+        if end is not None:
+            cond = ds.field(date_col) <= pd.Timestamp(end)
+            filtro = cond if filtro is None else filtro & cond
+
+        if columns is not None:
+            columns = list(dict.fromkeys(['ticker', date_col] + list(columns)))
+            columns = [c for c in columns if c in dataset.schema.names]
+
+        table = dataset.to_table(columns=columns, filter=filtro)
+        df = table.to_pandas()
+        df['ticker'] = df['ticker'].astype(str)
+        return df[['ticker'] + [c for c in df.columns if c != 'ticker']]
+
+
+def get_storage(backend="csv", root=None):
+    """Crea un backend de almacenamiento por nombre ('csv' o 'parquet')"""
+    if backend == "csv":
+        return CsvStorage(root or "../data/raw")
+    if backend == "parquet":
+        return ParquetStorage(root or "../data/raw_parquet")
+    raise ValueError(f"Backend de almacenamiento desconocido: {backend}")
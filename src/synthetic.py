@@ -0,0 +1,302 @@
+"""
+Fuentes Sintéticas de Datos (Yahoo Finance + Alpha Vantage) sin Red
+Para benchmarks y pruebas locales del pipeline completo
+
+- SyntheticTicker: imita yf.Ticker (history, balance_sheet, financials,
+  cashflow, info) con OHLCV y estados con los nombres de MAPEO_CONTABLE_YAHOO
+- SyntheticSource: fábrica de tickers + reemplazo de requests.get que
+  responde INCOME_STATEMENT / BALANCE_SHEET / CASH_FLOW como Alpha Vantage
+- synthetic_panel: panel PIT ya armado (para medir solo los factores)
+
+Cada ticker se genera con una semilla propia (ticker + seed), así sus datos
+no dependen del tamaño del universo ni del orden de las peticiones.
+"""
+
+import json
+import os
+import sys
+import zlib
+from functools import cached_property
+from time import sleep
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.diccionario_variables import (
+    MAPEO_CONTABLE_YAHOO, MAPEO_CONTABLE_ALPHA_VANTAGE, ESTADOS_ALPHA_VANTAGE,
+    SIGNO_ALPHA_VANTAGE_A_YAHOO
+)
+
+# Códigos que trae cada estado de yf.Ticker (los nombres salen de MAPEO_CONTABLE_YAHOO)
+YAHOO_STATEMENTS = {
+    'financials': ['sale', 'cogs', 'gp', 'xsga', 'xrd', 'ebitda', 'dp', 'ebit', 'int',
+                   'pi', 'tax', 'ni'],
+    'balance_sheet': ['at', 'ca', 'rec', 'cash', 'inv', 'intan', 'ppen', 'lt', 'cl', 'ap',
+                      'debtst', 'debtlt', 'seq', 're'],
+    'cashflow': ['ocf', 'capx', 'fcf', 'eqbb', 'eqis'],
+}
+
+AV_FUNCTIONS = {
+    'INCOME_STATEMENT': 'income',
+    'BALANCE_SHEET': 'balance',
+    'CASH_FLOW': 'cashflow',
+}
+
+
+def synthetic_tickers(n_tickers):
+    return [f"T{i:05d}" for i in range(n_tickers)]
+
+
+def _ticker_rng(ticker, seed):
+    return np.random.default_rng([zlib.crc32(ticker.encode('utf-8')), seed])
+
+
+# ===== GENERADORES =====
+
+def trading_calendar(start="2016-01-01", end="2023-12-31"):
+    """Días hábiles con la zona horaria de Yahoo (bdate_range con tz es lento: se arma una vez)"""
+    return pd.bdate_range(start, end, name='Date').tz_localize('America/New_York')
+
+
+def synthetic_prices(ticker, start="2016-01-01", end="2023-12-31", seed=0, calendar=None):
+    """OHLCV diario con el formato de yf.Ticker.history (índice Date con zona horaria)"""
+    rng = _ticker_rng(ticker, seed)
+    dates = calendar if calendar is not None else trading_calendar(start, end)
+    n = len(dates)
+
+    ret = rng.normal(0.0003, rng.uniform(0.01, 0.03), n)
+    close = rng.uniform(10, 200) * np.exp(np.cumsum(ret))
+    open_ = close * np.exp(-ret * rng.uniform(0, 1, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.005, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.005, n)))
+    dividends = np.where(np.arange(n) % 63 == 62, close * 0.004, 0.0)  # Trimestral
+
+    return pd.DataFrame({
+        'Open': open_, 'High': high, 'Low': low, 'Close': close,
+        'Volume': rng.lognormal(13, 1, n).round(),
+        'Dividends': dividends, 'Stock Splits': 0.0,
+    }, index=dates)
+
+
+def synthetic_statements(ticker, n_reports=4, last_fiscal="2023-12-31", missing_rate=0.1, seed=0):
+    """
+    Estados anuales contables coherentes (gp = sale - cogs, seq = at - lt...).
+
+    Returns:
+        dict estado -> DataFrame con el formato de yf.Ticker (una fila por
+        ítem, una columna por fecha fiscal, la más reciente primero). Con
+        probabilidad missing_rate cada ítem falta completo (como en Yahoo).
+    """
+    rng = _ticker_rng(ticker, seed + 1)
+    dates = pd.DatetimeIndex([pd.Timestamp(last_fiscal) - pd.DateOffset(years=k)
+                              for k in range(n_reports)])
+
+    def u(low, high):
+        return rng.uniform(low, high, n_reports)
+
+    v = {}
+    v['at'] = rng.lognormal(21, 1.5) * np.cumprod(1 + rng.normal(0.05, 0.1, n_reports))[::-1]
+    v['ca'] = v['at'] * u(0.2, 0.5)
+    v['cash'] = v['ca'] * u(0.1, 0.4)
+    v['rec'] = v['ca'] * u(0.2, 0.4)
+    v['inv'] = v['ca'] * u(0.0, 0.3)
+    v['ppen'] = v['at'] * u(0.2, 0.5)
+    v['intan'] = v['at'] * u(0.0, 0.2)
+    v['lt'] = v['at'] * u(0.3, 0.8)
+    v['cl'] = v['lt'] * u(0.3, 0.6)
+    v['ap'] = v['cl'] * u(0.2, 0.5)
+    v['debtst'] = v['cl'] * u(0.0, 0.3)
+    v['debtlt'] = v['lt'] * u(0.2, 0.5)
+    v['seq'] = v['at'] - v['lt']
+    v['re'] = v['seq'] * u(-0.2, 0.9)
+
+    v['sale'] = v['at'] * u(0.3, 1.5)
+    v['cogs'] = v['sale'] * u(0.4, 0.8)
+    v['gp'] = v['sale'] - v['cogs']
+    v['xsga'] = v['sale'] * u(0.05, 0.2)
+    v['xrd'] = v['sale'] * u(0.0, 0.08)
+    v['ebitda'] = v['gp'] - v['xsga'] - v['xrd']
+    v['dp'] = v['at'] * u(0.02, 0.06)
+    v['ebit'] = v['ebitda'] - v['dp']
+    v['int'] = v['debtlt'] * 0.05
+    v['pi'] = v['ebit'] - v['int']
+    v['tax'] = np.maximum(v['pi'], 0) * 0.21
+    v['ni'] = v['pi'] - v['tax']
+
+    v['ocf'] = v['ni'] + v['dp'] + v['at'] * rng.normal(0, 0.02, n_reports)
+    v['capx'] = -v['at'] * u(0.01, 0.08)  # Salida de caja: negativo como en Yahoo
+    v['fcf'] = v['ocf'] + v['capx']
+    v['eqbb'] = -v['at'] * u(0.0, 0.02)
+    v['eqis'] = v['at'] * u(0.0, 0.01)
+
+    statements = {}
+    for statement, codes in YAHOO_STATEMENTS.items():
+        kept = [c for c in codes if rng.uniform() >= missing_rate]
+        rows = {MAPEO_CONTABLE_YAHOO[c]: v[c] for c in kept}
+        if statement == 'balance_sheet':
+            rows['Ordinary Shares Number'] = np.full(n_reports, rng.lognormal(18, 1)).round()
+        statements[statement] = pd.DataFrame(rows, index=dates).T
+    statements['_values'] = v  # Valores completos (Alpha Vantage sí los tiene)
+    return statements
+
+
+def alpha_vantage_payload(ticker, function, statements):
+    """JSON de Alpha Vantage (valores como texto, CapEx en positivo) para function"""
+    if function not in AV_FUNCTIONS:
+        return {'Error Message': f'Invalid API call: {function}'}
+    values = statements['_values']
+    dates = statements['balance_sheet'].columns
+    reports = []
+    for i, date in enumerate(dates):
+        report = {'fiscalDateEnding': date.strftime('%Y-%m-%d'), 'reportedCurrency': 'USD'}
+        for code in ESTADOS_ALPHA_VANTAGE[AV_FUNCTIONS[function]]:
+            value = values[code][i] * SIGNO_ALPHA_VANTAGE_A_YAHOO.get(code, 1)
+            report[MAPEO_CONTABLE_ALPHA_VANTAGE[code]] = str(int(round(value)))
+        reports.append(report)
+    return {'symbol': ticker, 'annualReports': reports, 'quarterlyReports': []}
+
+
+# ===== FUENTES (REEMPLAZOS DE yf.Ticker / requests.get) =====
+
+class SyntheticTicker:
+    """Mismo acceso que yf.Ticker para lo que usa el collector"""
+
+    def __init__(self, ticker, source):
+        self.ticker = ticker
+        self.source = source
+
+    @cached_property
+    def _statements(self):
+        self.source.wait()
+        return synthetic_statements(self.ticker, self.source.n_reports, self.source.last_fiscal,
+                                    self.source.missing_rate, self.source.seed)
+
+    @cached_property
+    def _prices(self):
+        return synthetic_prices(self.ticker, seed=self.source.seed, calendar=self.source.calendar)
+
+    def history(self, start=None, end=None, **kwargs):
+        self.source.wait()
+        prices = self._prices
+        if start is not None:
+            prices = prices[prices.index >= pd.Timestamp(start).tz_localize(prices.index.tz)]
+        if end is not None:
+            prices = prices[prices.index < pd.Timestamp(end).tz_localize(prices.index.tz)]
+        return prices.copy()
+
+    @property
+    def balance_sheet(self):
+        return self._statements['balance_sheet']
+
+    @property
+    def financials(self):
+        return self._statements['financials']
+
+    @property
+    def cashflow(self):
+        return self._statements['cashflow']
+
+    @property
+    def info(self):
+        self.source.wait()
+        shares = self._statements['balance_sheet'].loc['Ordinary Shares Number'].iloc[0]
+        return {'symbol': self.ticker, 'sharesOutstanding': float(shares)}
+
+
+class SyntheticResponse:
+    """Lo que el collector usa de requests.Response"""
+
+    def __init__(self, payload, status_code=200):
+        self.content = json.dumps(payload).encode('utf-8')
+        self.status_code = status_code
+        self.headers = {'Content-Type': 'application/json'}
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class SyntheticSource:
+    """
+    Universo sintético para HybridDataCollector.
+
+    Ejemplo:
+        source = SyntheticSource(latency=0.05)
+        collector = HybridDataCollector(ticker_factory=source.ticker, http_get=source.get,
+                                        use_cache=False, verbose=False)
+
+    latency: segundos de espera por petición (simula la red; 0 = sin espera)
+    missing_rate: probabilidad de que Yahoo no traiga un ítem (dispara el
+        complemento de Alpha Vantage)
+    """
+
+    def __init__(self, start="2016-01-01", end="2023-12-31", n_reports=4,
+                 last_fiscal="2023-12-31", missing_rate=0.1, latency=0.0, seed=0):
+        self.start = start
+        self.end = end
+        self.n_reports = n_reports
+        self.last_fiscal = last_fiscal
+        self.missing_rate = missing_rate
+        self.latency = latency
+        self.seed = seed
+
+    @cached_property
+    def calendar(self):
+        return trading_calendar(self.start, self.end)
+
+    def wait(self):
+        if self.latency:
+            sleep(self.latency)
+
+    def ticker(self, symbol):
+        """Reemplazo de yf.Ticker"""
+        return SyntheticTicker(symbol, self)
+
+    def get(self, url, params=None, **kwargs):
+        """Reemplazo de requests.get para la API de Alpha Vantage"""
+        self.wait()
+        params = params or {}
+        symbol = params.get('symbol', '')
+        statements = synthetic_statements(symbol, self.n_reports, self.last_fiscal,
+                                          self.missing_rate, self.seed)
+        return SyntheticResponse(alpha_vantage_payload(symbol, params.get('function'), statements))
+
+
+# ===== PANEL PIT =====
+
+def synthetic_panel(n_tickers, n_days=504, reports_per_year=1, seed=0):
+    """Panel sintético con la forma del output del notebook 02"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2016-01-01", periods=n_days)
+    tickers = np.array(synthetic_tickers(n_tickers))
+
+    ret = rng.normal(0.0004, 0.02, size=(n_tickers, n_days))
+    close = 50 * np.exp(np.cumsum(ret, axis=1))
+
+    # Un reporte cada 252 / reports_per_year días, repetido en los días siguientes
+    report_len = 252 // reports_per_year
+    report_id = np.arange(n_days) // report_len
+    n_reports = report_id.max() + 1
+    at = rng.lognormal(22, 1, size=(n_tickers, 1)) * np.cumprod(
+        1 + rng.normal(0.05, 0.1, size=(n_tickers, n_reports)), axis=1)
+    at_daily = at[:, report_id]
+
+    panel = pd.DataFrame({
+        "ticker": np.repeat(tickers, n_days),
+        "date_market": np.tile(dates, n_tickers),
+        "date_accounting": np.tile(dates[report_id * report_len], n_tickers),
+        "Close": close.ravel(),
+        "shares_outstanding": np.repeat(rng.lognormal(19, 1, n_tickers), n_days),
+        "at": at_daily.ravel(),
+    })
+    for col, (low, high) in {"lt": (0.3, 0.8), "seq": (0.2, 0.6), "sale": (0.3, 1.5),
+                             "cogs": (0.2, 0.9), "ebit": (0.0, 0.2), "ni": (-0.05, 0.15),
+                             "capx": (0.01, 0.1), "cash": (0.02, 0.3), "inv": (0.0, 0.2),
+                             "rec": (0.02, 0.2)}.items():
+        ratio = rng.uniform(low, high, size=(n_tickers, n_reports))[:, report_id]
+        panel[col] = (ratio * at_daily).ravel()
+    return panel